@@ -0,0 +1,203 @@
+"""End-to-end benchmarks for the hot paths of the API
+
+Run from backend/:
+
+    python -m benchmarks.run_benchmarks                  # report only
+    python -m benchmarks.run_benchmarks --save-baseline  # store results
+    python -m benchmarks.run_benchmarks --compare        # fail on regressions
+
+Baselines live in benchmarks/baselines/<name>.json, one per machine or
+CI runner, so comparisons are only made against the same hardware. None
+are committed; record one with --save-baseline before using --compare.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.standins import local_backends
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+def summarize(latencies: List[float], wall_seconds: float) -> Dict:
+    """Throughput and latency percentiles in milliseconds"""
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "throughput_per_s": round(len(latencies) / wall_seconds, 2),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+def run_load(call: Callable[[], None], requests: int, concurrency: int, warmup: int) -> Dict:
+    """Issue `requests` calls across `concurrency` threads after a warmup"""
+    for _ in range(warmup):
+        call()
+
+    def timed_call(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed_call, range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+def bench_http(client, path: str, args) -> Dict:
+    def call():
+        response = client.get(path)
+        response.raise_for_status()
+
+    return run_load(call, args.requests, args.concurrency, args.warmup)
+
+def bench_ws_fanout(client, args) -> Dict:
+    """Time to first message for many concurrent /ws/stream subscribers"""
+    latencies = []
+    lock = threading.Lock()
+
+    def subscriber():
+        started = time.perf_counter()
+        with client.websocket_connect("/ws/stream") as websocket:
+            websocket.receive_json()
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=subscriber) for _ in range(args.ws_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started)
+
+def bench_training(args) -> Dict:
+    """Per-epoch times of LSTMPredictor.train on synthetic hourly data"""
+    from tensorflow import keras
+    from models.lstm_model import LSTMPredictor
+
+    class EpochTimer(keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.durations = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self._started = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.durations.append(time.perf_counter() - self._started)
+
+    hours = np.arange(args.train_hours)
+    history = 300 + 100 * np.sin(2 * np.pi * hours / 24) + np.random.normal(0, 20, len(hours))
+
+    predictor = LSTMPredictor()
+    timer = EpochTimer()
+    started = time.perf_counter()
+    predictor.train(history, epochs=args.train_epochs, verbose=0, callbacks=[timer])
+    return summarize(timer.durations, time.perf_counter() - started)
+
+def bench_spark(args) -> Dict:
+    """Rows per second through the windowed aggregation fed by a rate source"""
+    from services.spark_streaming import SparkStreamProcessor
+
+    processor = SparkStreamProcessor("EnergyForecastBenchmark")
+    try:
+        stream_df = processor.process_rate_stream(rows_per_second=args.spark_rows_per_second)
+        query = processor.write_to_memory(processor.aggregate_stream(stream_df), "benchmark_agg")
+        time.sleep(args.spark_seconds)
+        progress = [p for p in query.recentProgress if p.get("numInputRows")]
+        query.stop()
+    finally:
+        processor.stop()
+
+    latencies = [p["durationMs"]["triggerExecution"] / 1000 for p in progress] or [0.0]
+    rows = sum(p["numInputRows"] for p in progress)
+    result = summarize(latencies, args.spark_seconds)
+    result["rows_per_s"] = round(rows / args.spark_seconds, 2)
+    return result
+
+def run(args) -> Dict:
+    results = {}
+    with local_backends() as client:
+        results["predictions"] = bench_http(client, "/api/predictions?hours=24", args)
+        results["predictions_720h_columnar"] = bench_http(
+            client, "/api/predictions?hours=720&format=columnar", args
+        )
+        results["metrics"] = bench_http(client, "/api/metrics", args)
+        results["ws_fanout"] = bench_ws_fanout(client, args)
+
+    if not args.skip_training:
+        results["training"] = bench_training(args)
+    if not args.skip_spark:
+        results["spark_rate"] = bench_spark(args)
+    return results
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Benchmarks whose p99 or throughput regressed beyond `tolerance`"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+        if current["throughput_per_s"] < previous["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_per_s']}/s -> {current['throughput_per_s']}/s"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--train-hours", type=int, default=24 * 60)
+    parser.add_argument("--train-epochs", type=int, default=5)
+    parser.add_argument("--spark-rows-per-second", type=int, default=10000)
+    parser.add_argument("--spark-seconds", type=int, default=20)
+    parser.add_argument("--skip-training", action="store_true")
+    parser.add_argument("--skip-spark", action="store_true")
+    parser.add_argument("--baseline", default=platform.node() or "local",
+                        help="baseline name, defaults to the host name")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before --compare fails")
+    args = parser.parse_args()
+
+    # One log line per benchmark request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            sys.exit(f"No baseline at {baseline_path}, run with --save-baseline first")
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
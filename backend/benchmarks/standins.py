@@ -0,0 +1,39 @@
+"""Local stand-ins for every external backend used by the API
+
+    with local_backends() as client:
+        client.get("/api/predictions")
+
+MongoDB is replaced by mongomock, PostgreSQL by a SQLite file (the
+SQLAlchemy models are portable), and the Ethereum node by eth-tester.
+The Parquet archive is written to the same temporary directory.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+from unittest import mock
+
+import mongomock
+from fastapi.testclient import TestClient
+from web3 import Web3
+
+@contextmanager
+def local_backends(sqlite_path: Optional[str] = None):
+    """Boot the FastAPI app against local stand-ins and yield a TestClient"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sqlite_path = sqlite_path or os.path.join(tmpdir, "energy_forecast.db")
+        env = {
+            "POSTGRESQL_URL": f"sqlite:///{sqlite_path}",
+            "ARCHIVE_DIR": os.path.join(tmpdir, "archive"),
+        }
+
+        # Patched before startup so lifespan never reaches the network
+        with mock.patch.dict(os.environ, env), \
+                mock.patch("database.mongo_client.MongoClient", mongomock.MongoClient), \
+                mock.patch("services.blockchain_service.Web3.HTTPProvider",
+                           lambda *args, **kwargs: Web3.EthereumTesterProvider()):
+            # Imported late so the patched environment is seen at startup
+            from main import app
+
+            with TestClient(app) as client:
+                yield client
@@ -3,6 +3,8 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import os
 
+from services.instrumentation import timed
+
 class MongoDBClient:
     def __init__(self):
         """Initialize MongoDB connection"""
@@ -23,7 +25,7 @@ class MongoDBClient:
             print(f"⚠️  MongoDB connection failed: {e}. Using in-memory storage.")
             self.client = None
 
-    def store_predictions(self, predictions: List[Dict]) -> bool:
+    def store_predictions(self, predictions: List[Dict], model_version: str = 'LSTM-v1.0') -> bool:
         """Store predictions in MongoDB"""
         if not self.client:
             return False
@@ -34,11 +36,12 @@ class MongoDBClient:
                 doc = {
                     **pred,
                     'created_at': datetime.utcnow(),
-                    'model_version': 'LSTM-v1.0'
+                    'model_version': model_version
                 }
                 documents.append(doc)
 
-            self.predictions_collection.insert_many(documents)
+            with timed("mongo"):
+                self.predictions_collection.insert_many(documents)
             return True
         except Exception as e:
             print(f"Error storing predictions: {e}")
@@ -54,12 +57,39 @@ class MongoDBClient:
             if location:
                 query['location'] = location
 
-            cursor = self.predictions_collection.find(query).sort('created_at', -1).limit(limit)
-            return list(cursor)
+            with timed("mongo"):
+                cursor = self.predictions_collection.find(query).sort('created_at', -1).limit(limit)
+                return list(cursor)
         except Exception as e:
             print(f"Error retrieving predictions: {e}")
             return []
 
+    def get_predictions_before(self, cutoff: datetime, limit: int = 10000) -> List[Dict]:
+        """Oldest predictions created before `cutoff`, in _id order"""
+        if not self.client:
+            return []
+
+        try:
+            with timed("mongo"):
+                cursor = self.predictions_collection.find({'created_at': {'$lt': cutoff}}) \
+                    .sort('_id', 1).limit(limit)
+                return list(cursor)
+        except Exception as e:
+            print(f"Error retrieving old predictions: {e}")
+            return []
+
+    def delete_predictions(self, ids: List) -> int:
+        """Delete predictions by _id, returns the number removed"""
+        if not self.client or not ids:
+            return 0
+
+        try:
+            with timed("mongo"):
+                return self.predictions_collection.delete_many({'_id': {'$in': ids}}).deleted_count
+        except Exception as e:
+            print(f"Error deleting predictions: {e}")
+            return 0
+
     def store_metrics(self, metrics: Dict) -> bool:
         """Store system metrics"""
         if not self.client:
@@ -70,7 +100,8 @@ class MongoDBClient:
                 **metrics,
                 'timestamp': datetime.utcnow()
             }
-            self.metrics_collection.insert_one(doc)
+            with timed("mongo"):
+                self.metrics_collection.insert_one(doc)
             return True
         except Exception as e:
             print(f"Error storing metrics: {e}")
@@ -82,7 +113,8 @@ class MongoDBClient:
             return None
 
         try:
-            return self.metrics_collection.find_one(sort=[('timestamp', -1)])
+            with timed("mongo"):
+                return self.metrics_collection.find_one(sort=[('timestamp', -1)])
         except Exception as e:
             print(f"Error retrieving metrics: {e}")
             return None
@@ -113,7 +145,8 @@ class MongoDBClient:
                 }
             ]
 
-            result = list(self.predictions_collection.aggregate(pipeline))
+            with timed("mongo"):
+                result = list(self.predictions_collection.aggregate(pipeline))
             return result[0] if result else {}
         except Exception as e:
             print(f"Error aggregating stats: {e}")
@@ -1,9 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean
+from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean, Index
+from sqlalchemy import insert, update, delete, select, exists, func, and_, or_
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from datetime import datetime
+import numpy as np
+from typing import List, Optional, Tuple
 import os
 
+from services.instrumentation import timed
+
 Base = declarative_base()
 
 class Prediction(Base):
@@ -18,6 +23,25 @@ class Prediction(Base):
     location = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_predictions_location_timestamp', 'location', 'timestamp'),
+        # Keyset pagination by (created_at, id), optionally per location
+        Index('ix_predictions_created_at_id', 'created_at', 'id'),
+        Index('ix_predictions_location_created_at_id', 'location', 'created_at', 'id'),
+    )
+
+class Observation(Base):
+    __tablename__ = 'observations'
+
+    id = Column(Integer, primary_key=True)
+    location = Column(String(100), nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    actual_value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('ix_observations_location_timestamp', 'location', 'timestamp'),
+    )
+
 class Metrics(Base):
     __tablename__ = 'metrics'
 
@@ -40,8 +64,14 @@ class PostgreSQLClient:
         try:
             self.engine = create_engine(postgres_url)
             Base.metadata.create_all(self.engine)
-            Session = sessionmaker(bind=self.engine)
-            self.session = Session()
+            # create_all skips indexes added to tables that already exist
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(self.engine, checkfirst=True)
+            # Thread-local sessions: background jobs write from worker threads.
+            # Every method removes its session when done, returning the
+            # connection to the pool, so idle threads never hold one.
+            self.session = scoped_session(sessionmaker(bind=self.engine))
             print("✅ Connected to PostgreSQL")
         except Exception as e:
             print(f"⚠️  PostgreSQL connection failed: {e}")
@@ -60,13 +90,154 @@ class PostgreSQLClient:
                 model_version=prediction_data.get('model_version', 'LSTM-v1.0'),
                 location=prediction_data.get('location', 'default')
             )
-            self.session.add(prediction)
-            self.session.commit()
+            with timed("postgres"):
+                self.session.add(prediction)
+                self.session.commit()
             return True
         except Exception as e:
             print(f"Error storing prediction: {e}")
             self.session.rollback()
             return False
+        finally:
+            self.session.remove()
+
+    def store_predictions(self, predictions: List[dict], model_version: str = 'LSTM-v1.0') -> bool:
+        """Bulk insert forecast points keyed by their target hour"""
+        if not self.session:
+            return False
+
+        try:
+            rows = [
+                {
+                    'timestamp': datetime.strptime(p['time'], "%Y-%m-%d %H:%M:%S"),
+                    'predicted_value': p['predicted_value'],
+                    'confidence': p.get('confidence', 0.95),
+                    'model_version': model_version,
+                    'location': p.get('location', 'default')
+                }
+                for p in predictions
+            ]
+            with timed("postgres"):
+                self.session.execute(insert(Prediction), rows)
+                self.session.commit()
+            return True
+        except Exception as e:
+            print(f"Error storing predictions: {e}")
+            self.session.rollback()
+            return False
+        finally:
+            self.session.remove()
+
+    def reconcile_actuals(self, observations: List[dict], since: Optional[datetime] = None) -> int:
+        """Record observed values and copy them onto matching predictions
+
+        Observations are bulk inserted, then a single UPDATE joins them onto
+        predictions for the same location and hour. The UPDATE is limited to
+        the locations and hours just observed and overwrites earlier actuals,
+        so a corrected value replaces the old one. With no observations,
+        predictions for hours since `since` that still lack an actual are
+        checked instead, which picks up predictions stored after their
+        actuals arrived. Where an hour was observed more than once the
+        latest observation wins, as in `get_observation_matrix`. Returns
+        the number of predictions updated.
+        """
+        if not self.session:
+            return 0
+
+        try:
+            matches = (Observation.location == Prediction.location) & \
+                (Observation.timestamp == Prediction.timestamp)
+            observed = select(Observation.actual_value).where(matches) \
+                .order_by(Observation.id.desc()).limit(1).scalar_subquery()
+
+            query = update(Prediction) \
+                .where(exists().where(matches)) \
+                .values(actual_value=observed) \
+                .execution_options(synchronize_session=False)
+            if observations:
+                timestamps = [o['timestamp'] for o in observations]
+                query = query \
+                    .where(Prediction.location.in_({o['location'] for o in observations})) \
+                    .where(Prediction.timestamp.between(min(timestamps), max(timestamps)))
+            elif since is not None:
+                query = query \
+                    .where(Prediction.actual_value.is_(None)) \
+                    .where(Prediction.timestamp >= since)
+            else:
+                return 0
+
+            with timed("postgres"):
+                if observations:
+                    self.session.execute(insert(Observation), observations)
+                result = self.session.execute(query)
+                self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reconciling actuals: {e}")
+            self.session.rollback()
+            return 0
+        finally:
+            self.session.remove()
+
+    def get_observation_matrix(self, start: datetime, end: datetime) -> Tuple[List[str], np.ndarray]:
+        """Observed hourly actuals in [start, end) as one row per location
+
+        Returns the locations and an array of shape (n_locations, n_hours)
+        holding NaN for hours without an observation. Where an hour was
+        observed more than once, the latest observation wins.
+        """
+        n_hours = int((end - start).total_seconds() // 3600)
+        if not self.session:
+            return [], np.empty((0, n_hours))
+
+        try:
+            with timed("postgres"):
+                rows = self.session.execute(
+                    select(Observation.location, Observation.timestamp, Observation.actual_value)
+                    .where(Observation.timestamp >= start)
+                    .where(Observation.timestamp < end)
+                    .order_by(Observation.id)
+                ).all()
+        except Exception as e:
+            print(f"Error getting observations: {e}")
+            return [], np.empty((0, n_hours))
+        finally:
+            self.session.remove()
+
+        locations = sorted({row.location for row in rows})
+        index = {location: i for i, location in enumerate(locations)}
+        matrix = np.full((len(locations), n_hours), np.nan)
+        for row in rows:
+            matrix[index[row.location], int((row.timestamp - start).total_seconds() // 3600)] = row.actual_value
+        return locations, matrix
+
+    def get_prediction_accuracy(self, since: datetime) -> dict:
+        """MAE and MAPE over reconciled predictions for hours since `since`"""
+        if not self.session:
+            return {}
+
+        try:
+            error = func.abs(Prediction.actual_value - Prediction.predicted_value)
+            with timed("postgres"):
+                count, mae, mape = self.session.execute(
+                    select(
+                        func.count(),
+                        func.avg(error),
+                        func.avg(error / Prediction.actual_value) * 100
+                    )
+                    .where(Prediction.actual_value.isnot(None))
+                    .where(Prediction.actual_value != 0)
+                    .where(Prediction.timestamp >= since)
+                ).one()
+
+            if not count:
+                return {}
+            return {'count': count, 'mae': float(mae), 'mape': float(mape)}
+        except Exception as e:
+            print(f"Error computing prediction accuracy: {e}")
+            return {}
+        finally:
+            self.session.remove()
 
     def get_metrics(self) -> dict:
         """Get latest metrics"""
@@ -80,7 +251,8 @@ class PostgreSQLClient:
             }
 
         try:
-            latest_metric = self.session.query(Metrics).order_by(Metrics.timestamp.desc()).first()
+            with timed("postgres"):
+                latest_metric = self.session.query(Metrics).order_by(Metrics.timestamp.desc()).first()
 
             if latest_metric:
                 return {
@@ -105,6 +277,8 @@ class PostgreSQLClient:
                 'data_points': 1.2,
                 'predictions_today': 8432
             }
+        finally:
+            self.session.remove()
 
     def update_metrics(self, metrics_data: dict) -> bool:
         """Update system metrics"""
@@ -119,13 +293,39 @@ class PostgreSQLClient:
                 predictions_today=metrics_data.get('predictions_today', 0),
                 active_sensors=metrics_data.get('active_sensors', 0)
             )
-            self.session.add(metrics)
-            self.session.commit()
+            with timed("postgres"):
+                self.session.add(metrics)
+                self.session.commit()
             return True
         except Exception as e:
             print(f"Error updating metrics: {e}")
             self.session.rollback()
             return False
+        finally:
+            self.session.remove()
+
+    def record_accuracy(self, mape: float) -> bool:
+        """Write a measured MAPE as model accuracy, carrying other metrics over"""
+        if not self.session:
+            return False
+
+        try:
+            with timed("postgres"):
+                latest = self.session.query(Metrics).order_by(Metrics.timestamp.desc()).first()
+        except Exception as e:
+            print(f"Error getting metrics: {e}")
+            return False
+        finally:
+            self.session.remove()
+
+        # Only real metrics are carried over, never the mock defaults
+        return self.update_metrics({
+            'current_prediction': latest.current_prediction if latest else 0,
+            'model_accuracy': round(max(0.0, 100 - mape), 2),
+            'data_points': latest.data_points if latest else 0,
+            'predictions_today': latest.predictions_today if latest else 0,
+            'active_sensors': latest.active_sensors if latest else 0
+        })
 
     def get_prediction_history(self, limit: int = 100):
         """Get prediction history"""
@@ -133,10 +333,11 @@ class PostgreSQLClient:
             return []
 
         try:
-            predictions = self.session.query(Prediction) \
-                .order_by(Prediction.created_at.desc()) \
-                .limit(limit) \
-                .all()
+            with timed("postgres"):
+                predictions = self.session.query(Prediction) \
+                    .order_by(Prediction.created_at.desc()) \
+                    .limit(limit) \
+                    .all()
 
             return [
                 {
@@ -152,11 +353,148 @@ class PostgreSQLClient:
         except Exception as e:
             print(f"Error getting prediction history: {e}")
             return []
+        finally:
+            self.session.remove()
+
+    def pool_checked_out(self) -> int:
+        """Connections currently checked out of the engine pool"""
+        if not self.engine:
+            return 0
+        return self.engine.pool.checkedout()
+
+    def get_prediction_page(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            location: Optional[str] = None,
+                            after: Optional[Tuple[datetime, int]] = None,
+                            limit: int = 1000,
+                            columns: Optional[list] = None) -> list:
+        """One keyset page of predictions ordered by (created_at, id)
+
+        `after` is the (created_at, id) of the last row of the previous
+        page, so each page is an index range scan rather than an OFFSET.
+        """
+        if not self.session:
+            return []
+
+        try:
+            query = select(*(columns or [Prediction]))
+            if start:
+                query = query.where(Prediction.created_at >= start)
+            if end:
+                query = query.where(Prediction.created_at < end)
+            if location:
+                query = query.where(Prediction.location == location)
+            if after:
+                created_at, last_id = after
+                query = query.where(or_(
+                    Prediction.created_at > created_at,
+                    and_(Prediction.created_at == created_at, Prediction.id > last_id)
+                ))
+            query = query.order_by(Prediction.created_at, Prediction.id).limit(limit)
+
+            with timed("postgres"):
+                result = self.session.execute(query)
+                return result.scalars().all() if columns is None else result.all()
+        except Exception as e:
+            print(f"Error getting prediction page: {e}")
+            return []
+        finally:
+            self.session.remove()
+
+    def get_prediction_series(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              location: Optional[str] = None, max_points: int = 200000,
+                              page_size: int = 50000) -> dict:
+        """Target hour, predicted and actual values as arrays, read page by page
+
+        Rows are selected and ordered by creation time like the pages.
+        """
+        columns = [Prediction.id, Prediction.created_at, Prediction.timestamp,
+                   Prediction.predicted_value, Prediction.actual_value]
+        timestamps, predicted, actual = [], [], []
+        after = None
+
+        while len(timestamps) < max_points:
+            rows = self.get_prediction_page(start, end, location, after,
+                                            min(page_size, max_points - len(timestamps)), columns)
+            if not rows:
+                break
+            for row in rows:
+                timestamps.append(row.timestamp)
+                predicted.append(row.predicted_value)
+                actual.append(row.actual_value)
+            after = (rows[-1].created_at, rows[-1].id)
+
+        return {
+            'timestamp': np.array(timestamps, dtype='datetime64[us]'),
+            'predicted_value': np.array(predicted, dtype=float),
+            'actual_value': np.array(actual, dtype=float),
+            'truncated': len(timestamps) >= max_points
+        }
+
+    def delete_predictions(self, ids: List[int]) -> int:
+        """Delete predictions by primary key, returns the number removed"""
+        if not self.session or not ids:
+            return 0
+
+        try:
+            with timed("postgres"):
+                result = self.session.execute(
+                    delete(Prediction)
+                    .where(Prediction.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            print(f"Error deleting predictions: {e}")
+            self.session.rollback()
+            return 0
+        finally:
+            self.session.remove()
+
+    def get_observations_before(self, cutoff: datetime, limit: int = 10000) -> list:
+        """Oldest observations for hours before `cutoff`, in id order"""
+        if not self.session:
+            return []
+
+        try:
+            with timed("postgres"):
+                return self.session.execute(
+                    select(Observation)
+                    .where(Observation.timestamp < cutoff)
+                    .order_by(Observation.id)
+                    .limit(limit)
+                ).scalars().all()
+        except Exception as e:
+            print(f"Error getting old observations: {e}")
+            return []
+        finally:
+            self.session.remove()
+
+    def delete_observations(self, ids: List[int]) -> int:
+        """Delete observations by primary key, returns the number removed"""
+        if not self.session or not ids:
+            return 0
+
+        try:
+            with timed("postgres"):
+                result = self.session.execute(
+                    delete(Observation)
+                    .where(Observation.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            print(f"Error deleting observations: {e}")
+            self.session.rollback()
+            return 0
+        finally:
+            self.session.remove()
 
     def close(self):
         """Close database connection"""
         if self.session:
-            self.session.close()
+            self.session.remove()
         if self.engine:
             self.engine.dispose()
         print("✅ PostgreSQL connection closed")
@@ -1,15 +1,30 @@
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
+import os
 from contextlib import asynccontextmanager
 
 from models.lstm_model import LSTMPredictor
+from models.statistical_model import StatisticalPredictor
+from models.forecast_columns import FIELDS, columns_to_records
 from services.spark_streaming import SparkStreamProcessor
 from services.blockchain_service import BlockchainService
+from services.forecast_scheduler import ForecastStore, ForecastScheduler
+from services.online_trainer import OnlineTrainer
+from services.accuracy_tracker import AccuracyTracker
+from services.downsampling import DOWNSAMPLERS
+from services.pagination import encode_cursor, decode_cursor
+from services.archiver import PredictionArchive, RetentionJob
+from services.response_encoding import UnsupportedEncoding, negotiate_encoding, encode_forecast, iter_ndjson
+from services.instrumentation import (
+    timed, monitor_event_loop_lag, render_metrics,
+    DB_POOL_CHECKED_OUT, FORECAST_CACHE, WEBSOCKET_CONNECTIONS
+)
 from database.mongo_client import MongoDBClient
 from database.postgres_client import PostgreSQLClient
 
@@ -18,14 +33,49 @@ from database.postgres_client import PostgreSQLClient
 async def lifespan(app: FastAPI):
     # Startup
     app.state.lstm_model = LSTMPredictor()
+    app.state.fallback_model = StatisticalPredictor(
+        os.getenv('FALLBACK_FORECASTER', 'holt-winters')
+    )
     app.state.mongo_client = MongoDBClient()
     app.state.postgres_client = PostgreSQLClient()
     app.state.blockchain_service = BlockchainService()
+    app.state.forecast_store = ForecastStore()
+    app.state.forecast_scheduler = ForecastScheduler(
+        app.state.forecast_store,
+        app.state.lstm_model,
+        app.state.fallback_model,
+        app.state.mongo_client,
+        app.state.postgres_client,
+        locations=os.getenv('FORECAST_LOCATIONS', 'default').split(',')
+    )
+    app.state.forecast_scheduler.start()
+    app.state.online_trainer = OnlineTrainer(app.state.lstm_model, app.state.fallback_model)
+    app.state.online_trainer.start()
+    app.state.accuracy_tracker = AccuracyTracker(
+        app.state.postgres_client,
+        app.state.lstm_model,
+        app.state.fallback_model
+    )
+    app.state.accuracy_tracker.start()
+    app.state.prediction_archive = PredictionArchive(os.getenv('ARCHIVE_DIR', 'archive'))
+    app.state.retention_job = RetentionJob(
+        app.state.prediction_archive,
+        app.state.postgres_client,
+        app.state.mongo_client
+    )
+    app.state.retention_job.start()
+    DB_POOL_CHECKED_OUT.set_function(app.state.postgres_client.pool_checked_out)
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
 
     print("✅ All services initialized")
     yield
 
     # Shutdown
+    loop_lag_task.cancel()
+    await app.state.online_trainer.stop()
+    await app.state.accuracy_tracker.stop()
+    await app.state.retention_job.stop()
+    await app.state.forecast_scheduler.stop()
     app.state.mongo_client.close()
     app.state.postgres_client.close()
     print("✅ All services closed")
@@ -37,6 +87,24 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Inference slower than this is served by the statistical tier instead
+LATENCY_BUDGET_MS = float(os.getenv('PREDICTION_LATENCY_BUDGET_MS', '100'))
+
+# Buffered responses are held in memory whole; larger exports must stream
+MAX_PREDICTION_HOURS = int(os.getenv('MAX_PREDICTION_HOURS', '720'))
+MAX_PREDICTION_LOCATIONS = int(os.getenv('MAX_PREDICTION_LOCATIONS', '100'))
+MAX_STREAM_HOURS = int(os.getenv('MAX_STREAM_HOURS', '8760'))
+MAX_STREAM_LOCATIONS = int(os.getenv('MAX_STREAM_LOCATIONS', '10000'))
+STREAM_BATCH_LOCATIONS = int(os.getenv('STREAM_BATCH_LOCATIONS', '64'))
+
+# Actuals are inserted and reconciled in one statement per upload
+MAX_ACTUALS_HOURS = int(os.getenv('MAX_ACTUALS_HOURS', '8760'))
+
+# History pages and downsampled series sent to charts
+MAX_HISTORY_PAGE = int(os.getenv('MAX_HISTORY_PAGE', '5000'))
+MAX_HISTORY_POINTS = int(os.getenv('MAX_HISTORY_POINTS', '10000'))
+MAX_HISTORY_SOURCE_POINTS = int(os.getenv('MAX_HISTORY_SOURCE_POINTS', '200000'))
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +124,12 @@ class PredictionResponse(BaseModel):
     model_version: str
     confidence: float
     timestamp: str
+    tier: str
+
+class ActualsRequest(BaseModel):
+    location: str = "default"
+    values: List[float] = Field(max_length=MAX_ACTUALS_HOURS)
+    start: Optional[datetime] = None
 
 class MetricsResponse(BaseModel):
     currentPrediction: str
@@ -76,27 +150,269 @@ async def root():
         }
     }
 
+def _select_model(hours: int, budget_ms: Optional[float]):
+    """Pick the LSTM or statistical tier for an on-demand forecast"""
+    lstm_model = app.state.lstm_model
+    budget = LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+    estimate = lstm_model.estimate_latency_ms(hours)
+
+    # Use the LSTM only when it is trained and expected to fit the budget
+    if lstm_model.trained and (estimate is None or estimate <= budget):
+        return lstm_model, "LSTM-v1.0", "lstm"
+
+    fallback_model = app.state.fallback_model
+    return fallback_model, f"{fallback_model.name}-v1.0", fallback_model.name
+
+def _forecast(locations: List[str], hours: int, budget_ms: Optional[float],
+              persist: bool = True) -> dict:
+    """Columnar forecast for the given locations, from the store when possible
+
+    With `persist` on, locations are registered with the scheduler, which
+    precomputes them and stores each forecast hour once. With it off, bulk
+    exports neither grow the precomputed set nor the prediction tables.
+    """
+    # Keep requested locations precomputed; the scheduler caps and expires them
+    if persist:
+        for location in locations:
+            app.state.forecast_scheduler.register(location)
+
+    slices = [app.state.forecast_store.lookup(location, hours) for location in locations]
+
+    # A refresh may swap snapshots between lookups; only mix slices of one
+    if all(slices) and len({s["base_time"] for s in slices}) == 1:
+        FORECAST_CACHE.labels("hit").inc()
+        base_time = slices[0]["base_time"]
+        model_version = slices[0]["model_version"]
+        tier = slices[0]["tier"]
+        columns = {
+            field: np.concatenate([s["columns"][field] for s in slices])
+            for field in FIELDS
+        }
+    else:
+        # Miss: compute on demand
+        FORECAST_CACHE.labels("miss").inc()
+        model, model_version, tier = _select_model(hours, budget_ms)
+        base_time = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        with timed("inference"):
+            columns = model.forecast_columns(locations, hours, base_time)
+
+    if tier == "lstm":
+        confidence = 0.942
+    else:
+        confidence = round(float(np.mean(columns["confidence"])), 3)
+
+    return {
+        "locations": locations,
+        "base_time": base_time,
+        "columns": columns,
+        "model_version": model_version,
+        "tier": tier,
+        "confidence": confidence
+    }
+
 @app.get("/api/predictions", response_model=PredictionResponse)
-async def get_predictions(hours: int = 24):
-    """Get energy consumption predictions for the next N hours"""
+def get_predictions(request: Request,
+                    hours: int = Query(24, ge=1, le=MAX_PREDICTION_HOURS),
+                    location: str = "default",
+                    budget_ms: Optional[float] = None, format: Optional[str] = None):
+    """Get energy consumption predictions for the next N hours
+
+    `location` may list several comma-separated locations for the compact
+    formats, chosen via `format` or the Accept header: columnar JSON,
+    msgpack or Arrow IPC. These skip per-row pydantic validation. A plain
+    def, so on-demand inference for a miss runs in the threadpool rather
+    than on the event loop.
+    """
     try:
-        # Generate predictions using LSTM model
-        predictions = app.state.lstm_model.predict(hours)
+        encoding = negotiate_encoding(request.headers.get("accept"), format)
+    except UnsupportedEncoding as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    locations = location.split(",")
+    if len(locations) > MAX_PREDICTION_LOCATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_PREDICTION_LOCATIONS} locations per request, use /api/predictions/stream"
+        )
+    if encoding == "json" and len(locations) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Multiple locations require a columnar, msgpack or arrow format"
+        )
+
+    try:
+        forecast = _forecast(locations, hours, budget_ms)
+
+        with timed("serialization"):
+            if encoding != "json":
+                body, media_type = encode_forecast(forecast, encoding)
+            else:
+                body = PredictionResponse(
+                    predictions=columns_to_records(forecast["columns"], 0, forecast["base_time"]),
+                    model_version=forecast["model_version"],
+                    confidence=forecast["confidence"],
+                    timestamp=datetime.utcnow().isoformat(),
+                    tier=forecast["tier"]
+                ).model_dump_json()
+                media_type = "application/json"
+
+        return Response(content=body, media_type=media_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Store in database
-        app.state.mongo_client.store_predictions(predictions)
+@app.get("/api/predictions/stream")
+async def stream_predictions(hours: int = Query(24, ge=1, le=MAX_STREAM_HOURS),
+                             location: str = "default",
+                             budget_ms: Optional[float] = None,
+                             chunk_hours: int = Query(168, ge=1, le=MAX_STREAM_HOURS)):
+    """Stream predictions as NDJSON, one line per location and block of hours
 
-        return PredictionResponse(
-            predictions=predictions,
-            model_version="LSTM-v1.0",
-            confidence=0.942,
-            timestamp=datetime.utcnow().isoformat()
+    Locations are forecast in batches as the body is consumed, so memory
+    stays flat for bulk exports. Streamed forecasts are not persisted.
+    """
+    locations = location.split(",")
+    if len(locations) > MAX_STREAM_LOCATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_STREAM_LOCATIONS} locations per stream"
         )
+
+    def generate():
+        for i in range(0, len(locations), STREAM_BATCH_LOCATIONS):
+            batch = locations[i:i + STREAM_BATCH_LOCATIONS]
+            forecast = _forecast(batch, hours, budget_ms, persist=False)
+            yield from iter_ndjson(forecast, chunk_hours)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+HISTORY_COLUMNS = ("id", "created_at", "timestamp", "location", "predicted_value", "actual_value")
+
+# Plain def: the blocking SQL and Parquet reads run in the threadpool
+@app.get("/api/predictions/history")
+def get_prediction_history(start: Optional[datetime] = None,
+                           end: Optional[datetime] = None,
+                           location: Optional[str] = None,
+                           points: Optional[int] = Query(None, ge=3, le=MAX_HISTORY_POINTS),
+                           method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+                           cursor: Optional[str] = None,
+                           limit: int = Query(1000, ge=1, le=MAX_HISTORY_PAGE)):
+    """Stored predictions by creation time, paginated or downsampled for charts
+
+    Without `points`, returns a page of raw rows and a `next_cursor` for
+    the following page. With `points`, one location's predictions created
+    in the range are reduced server-side to at most that many points over
+    their target hour, using LTTB or min/max buckets. Ranges older than
+    the retention age are read from the Parquet archive.
+    """
+    postgres_client = app.state.postgres_client
+    archive = app.state.prediction_archive
+    if points is not None and location is None:
+        # Series of different locations would interleave into one line
+        raise HTTPException(status_code=400, detail="Downsampling with `points` requires a location")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Stored timestamps are naive UTC
+    start, end = (
+        value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+        for value in (start, end)
+    )
+
+    try:
+        if points is None:
+            # Archived rows are all older than hot ones, so read them first
+            rows = archive.get_page(start, end, location, after, limit)
+            if len(rows) < limit:
+                hot_after = (rows[-1]["created_at"], rows[-1]["id"]) if rows else after
+                rows += [
+                    {column: getattr(p, column) for column in HISTORY_COLUMNS}
+                    for p in postgres_client.get_prediction_page(
+                        start, end, location, hot_after, limit - len(rows)
+                    )
+                ]
+
+            next_cursor = None
+            if len(rows) == limit:
+                next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+            return {
+                "points": [
+                    {
+                        "time": p["created_at"].isoformat(),
+                        "timestamp": p["timestamp"].isoformat(),
+                        "location": p["location"],
+                        "predicted_value": p["predicted_value"],
+                        "actual_value": p["actual_value"]
+                    }
+                    for p in rows
+                ],
+                "next_cursor": next_cursor
+            }
+
+        # The source-point cap covers archived and hot rows together
+        archived = archive.get_series(start, end, location, max_points=MAX_HISTORY_SOURCE_POINTS)
+        remaining = MAX_HISTORY_SOURCE_POINTS - len(archived["timestamp"])
+        if remaining > 0:
+            series = postgres_client.get_prediction_series(start, end, location, max_points=remaining)
+            series.update({
+                field: np.concatenate([archived[field], series[field]])
+                for field in ("timestamp", "predicted_value", "actual_value")
+            })
+        else:
+            series = archived
+
+        # Charted against the hour each prediction is for
+        order = np.argsort(series["timestamp"], kind="stable")
+        timestamps = series["timestamp"][order]
+        predicted = series["predicted_value"][order]
+        actual = series["actual_value"][order]
+        indices = DOWNSAMPLERS[method](timestamps.astype("int64"), predicted, points)
+
+        return {
+            "location": location,
+            "points": [
+                {
+                    "timestamp": str(timestamps[i]),
+                    "predicted_value": float(predicted[i]),
+                    "actual_value": None if np.isnan(actual[i]) else float(actual[i])
+                }
+                for i in indices
+            ],
+            "source_points": int(len(timestamps)),
+            "method": method,
+            "truncated": series["truncated"]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/actuals")
+def submit_actuals(actuals: ActualsRequest):
+    """Ingest observed hourly consumption for fine-tuning and accuracy tracking
+
+    `start` is the hour of the first value; without it the values are
+    taken to end with the last complete hour. With `start`, the values are
+    also reconciled onto stored predictions for the same location and hours.
+    A plain def, as reconciliation writes to the database.
+    """
+    if not app.state.online_trainer.submit(actuals.location, actuals.values, actuals.start):
+        raise HTTPException(status_code=400, detail="Too many locations with actuals")
+
+    reconciled = 0
+    if actuals.start:
+        reconciled = app.state.accuracy_tracker.reconcile(
+            actuals.location, actuals.start, actuals.values
+        )
+
+    return {
+        "status": "queued",
+        "pending_hours": app.state.online_trainer.pending_hours,
+        "reconciled_predictions": reconciled
+    }
+
 @app.get("/api/metrics", response_model=MetricsResponse)
-async def get_metrics():
+def get_metrics():
     """Get current system metrics"""
     try:
         metrics = app.state.postgres_client.get_metrics()
@@ -134,6 +450,7 @@ async def store_prediction_on_chain(prediction: float, contract_address: str):
 async def websocket_stream(websocket: WebSocket):
     """WebSocket endpoint for real-time data streaming"""
     await websocket.accept()
+    WEBSOCKET_CONNECTIONS.inc()
     try:
         while True:
             # Simulate real-time data
@@ -148,8 +465,15 @@ async def websocket_stream(websocket: WebSocket):
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        WEBSOCKET_CONNECTIONS.dec()
         await websocket.close()
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus exposition of per-stage latencies and runtime gauges"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,74 @@
+import numpy as np
+from typing import Dict, List
+
+class RunningErrors:
+    """MAE and MAPE accumulated per horizon step without keeping the errors"""
+
+    def __init__(self, horizon: int):
+        self.abs_error_sum = np.zeros(horizon)
+        self.pct_error_sum = np.zeros(horizon)
+        self.count = np.zeros(horizon)
+        self.pct_count = np.zeros(horizon)
+
+    def update(self, actual: np.ndarray, predicted: np.ndarray):
+        """Add a (n_windows, horizon) block of actuals and forecasts"""
+        abs_error = np.abs(actual - predicted)
+        nonzero = actual != 0
+
+        self.abs_error_sum += abs_error.sum(axis=0)
+        self.count += actual.shape[0]
+        self.pct_error_sum += np.where(nonzero, abs_error / np.where(nonzero, np.abs(actual), 1), 0).sum(axis=0)
+        self.pct_count += nonzero.sum(axis=0)
+
+    def summary(self) -> Dict:
+        mae_by_step = self.abs_error_sum / np.maximum(self.count, 1)
+        mape = 100 * self.pct_error_sum.sum() / max(self.pct_count.sum(), 1)
+        return {
+            "mae": float(self.abs_error_sum.sum() / max(self.count.sum(), 1)),
+            "mape": float(mape),
+            "accuracy": float(max(0.0, 100 - mape)),
+            "mae_by_horizon": np.round(mae_by_step, 3).tolist()
+        }
+
+class Backtester:
+    """Rolling-origin evaluation over many cutoffs and locations
+
+    Forecasts are made from every cutoff in
+    range(min_train_hours, n_hours - horizon + 1, step_hours) and scored
+    against the hours that followed. All locations are forecast together at
+    each cutoff; the LSTM additionally batches all cutoffs of a chunk into
+    a single inference per horizon step.
+    """
+
+    def __init__(self, horizon: int = 24, step_hours: int = 24,
+                 min_train_hours: int = 24 * 14, cutoffs_per_batch: int = 64):
+        self.horizon = horizon
+        self.step_hours = step_hours
+        self.min_train_hours = min_train_hours
+        self.cutoffs_per_batch = cutoffs_per_batch
+
+    def cutoffs(self, n_hours: int) -> List[int]:
+        return list(range(self.min_train_hours, n_hours - self.horizon + 1, self.step_hours))
+
+    def run(self, model, history: np.ndarray) -> Dict:
+        """Backtest an LSTMPredictor or StatisticalPredictor on (n_series, n_hours) actuals"""
+        history = np.atleast_2d(np.asarray(history, dtype=float))
+        cutoffs = self.cutoffs(history.shape[1])
+        errors = RunningErrors(self.horizon)
+
+        if hasattr(model, "forecast_recursive"):
+            for i in range(0, len(cutoffs), self.cutoffs_per_batch):
+                batch = cutoffs[i:i + self.cutoffs_per_batch]
+                context = np.concatenate([history[:, c - model.sequence_length:c] for c in batch])
+                actual = np.concatenate([history[:, c:c + self.horizon] for c in batch])
+                errors.update(actual, model.forecast_recursive(context, self.horizon))
+        else:
+            for c in cutoffs:
+                point, _ = model.forecaster.forecast(history[:, :c], self.horizon)
+                errors.update(history[:, c:c + self.horizon], np.maximum(0, point))
+
+        return {
+            "series": history.shape[0],
+            "cutoffs": len(cutoffs),
+            **errors.summary()
+        }
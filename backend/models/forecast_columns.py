@@ -0,0 +1,34 @@
+import numpy as np
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+
+# Per-hour fields shared by every forecaster, in output order
+FIELDS = ("predicted_value", "confidence", "lower_bound", "upper_bound")
+DECIMALS = {"predicted_value": 2, "confidence": 3, "lower_bound": 2, "upper_bound": 2}
+
+def records_to_columns(records: List[List[Dict]]) -> Dict[str, np.ndarray]:
+    """Stack per-location prediction lists into (n_locations, hours) arrays"""
+    return {
+        field: np.array([[p[field] for p in rows] for rows in records], dtype=np.float32)
+        for field in FIELDS
+    }
+
+def columns_to_records(columns: Dict[str, np.ndarray], row: int, base_time: datetime,
+                       start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+    """Expand one location's columns into the prediction dicts used by the API"""
+    stop = columns["predicted_value"].shape[1] if stop is None else stop
+    values = {
+        field: np.round(columns[field][row, start:stop].astype(float), DECIMALS[field]).tolist()
+        for field in FIELDS
+    }
+
+    records = []
+    for i in range(stop - start):
+        timestamp = base_time + timedelta(hours=start + i)
+        records.append({
+            "time": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "hour": timestamp.hour,
+            **{field: values[field][i] for field in FIELDS}
+        })
+
+    return records
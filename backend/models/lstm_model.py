@@ -1,16 +1,21 @@
 import numpy as np
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import tensorflow as tf
 from tensorflow import keras
 from sklearn.preprocessing import MinMaxScaler
 
+from models.forecast_columns import records_to_columns
+
 class LSTMPredictor:
     def __init__(self):
         self.model = self._build_model()
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.sequence_length = 24
         self.trained = False
+        self.inference_ms_per_hour: Optional[float] = None
+        self.fine_tune_count = 0
 
     def _build_model(self):
         """Build LSTM neural network architecture"""
@@ -33,19 +38,14 @@ class LSTMPredictor:
 
         return model
 
-    def train(self, historical_data: np.ndarray, epochs: int = 50):
+    def train(self, historical_data: np.ndarray, epochs: int = 50, verbose: int = 1,
+              callbacks: Optional[List[keras.callbacks.Callback]] = None):
         """Train the LSTM model on historical energy data"""
         # Normalize data
         scaled_data = self.scaler.fit_transform(historical_data.reshape(-1, 1))
 
         # Create sequences
-        X_train, y_train = [], []
-        for i in range(self.sequence_length, len(scaled_data)):
-            X_train.append(scaled_data[i-self.sequence_length:i, 0])
-            y_train.append(scaled_data[i, 0])
-
-        X_train, y_train = np.array(X_train), np.array(y_train)
-        X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
+        X_train, y_train = self._create_sequences(scaled_data)
 
         # Train model
         history = self.model.fit(
@@ -53,14 +53,106 @@ class LSTMPredictor:
             epochs=epochs,
             batch_size=32,
             validation_split=0.2,
-            verbose=1
+            verbose=verbose,
+            callbacks=callbacks
         )
 
         self.trained = True
         return history
 
+    def _create_sequences(self, scaled_data: np.ndarray):
+        """Sliding windows of `sequence_length` inputs and the next value"""
+        values = scaled_data.reshape(-1)
+        windows = np.lib.stride_tricks.sliding_window_view(values, self.sequence_length + 1)
+        X = windows[:, :-1].reshape(-1, self.sequence_length, 1)
+        y = windows[:, -1]
+        return X, y
+
+    def fine_tune(self, series: List[np.ndarray], epochs: int = 3,
+                  learning_rate: float = 0.0002):
+        """Warm-start training on newly arrived data only
+
+        Each array holds `sequence_length` hours of context followed by new
+        actuals. The scaler is reused rather than refit so the current
+        weights stay valid. Training runs on a copy of the model which is
+        swapped in when done, so concurrent inference never sees a
+        partially updated network.
+        """
+        if not hasattr(self.scaler, "data_min_"):
+            self.scaler.fit(np.concatenate(series).reshape(-1, 1))
+
+        windows = [
+            self._create_sequences(self.scaler.transform(values.reshape(-1, 1)))
+            for values in series
+            if len(values) > self.sequence_length
+        ]
+        if not windows:
+            return None
+
+        X_new = np.concatenate([X for X, _ in windows])
+        y_new = np.concatenate([y for _, y in windows])
+
+        candidate = keras.models.clone_model(self.model)
+        candidate.set_weights(self.model.get_weights())
+        candidate.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            loss='mse',
+            metrics=['mae', 'mape']
+        )
+        history = candidate.fit(X_new, y_new, epochs=epochs, batch_size=32, verbose=0)
+
+        # Publish atomically
+        self.model = candidate
+        self.fine_tune_count += 1
+        return history
+
+    def forecast_recursive(self, context: np.ndarray, horizon: int) -> np.ndarray:
+        """Multi-step forecasts for many context windows at once
+
+        context has shape (n_windows, >= sequence_length) in original units.
+        Each step runs one batched inference over every window and feeds
+        the outputs back in, so cost grows with the horizon, not n_windows.
+        """
+        n_windows = context.shape[0]
+        window = self.scaler.transform(
+            context[:, -self.sequence_length:].reshape(-1, 1)
+        ).reshape(n_windows, self.sequence_length)
+
+        outputs = np.empty((n_windows, horizon))
+        for step in range(horizon):
+            next_values = self.model.predict_on_batch(window[..., None])[:, 0]
+            outputs[:, step] = next_values
+            window = np.concatenate([window[:, 1:], next_values[:, None]], axis=1)
+
+        return self.scaler.inverse_transform(outputs.reshape(-1, 1)).reshape(n_windows, horizon)
+
+    def estimate_latency_ms(self, hours_ahead: int) -> Optional[float]:
+        """Expected inference time for a horizon, None until first measured"""
+        if self.inference_ms_per_hour is None:
+            return None
+        return self.inference_ms_per_hour * hours_ahead
+
     def predict(self, hours_ahead: int = 24) -> List[Dict]:
         """Generate energy consumption predictions"""
+        started = time.perf_counter()
+        predictions = self._predict(hours_ahead)
+
+        # Exponentially weighted per-hour cost feeds the latency budget
+        elapsed_ms = (time.perf_counter() - started) * 1000 / max(hours_ahead, 1)
+        if self.inference_ms_per_hour is None:
+            self.inference_ms_per_hour = elapsed_ms
+        else:
+            self.inference_ms_per_hour = 0.8 * self.inference_ms_per_hour + 0.2 * elapsed_ms
+
+        return predictions
+
+    def forecast_columns(self, locations: List[str], hours_ahead: int,
+                         base_time: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Forecast fields as (n_locations, hours_ahead) arrays"""
+        return records_to_columns([self.predict(hours_ahead) for _ in locations])
+
+    def _predict(self, hours_ahead: int) -> List[Dict]:
+        """Run model inference for the next N hours"""
         # Generate synthetic predictions for demo
         # In production, this would use the trained model
 
@@ -101,13 +193,7 @@ class LSTMPredictor:
         # Prepare test data
         scaled_data = self.scaler.transform(test_data.reshape(-1, 1))
 
-        X_test, y_test = [], []
-        for i in range(self.sequence_length, len(scaled_data)):
-            X_test.append(scaled_data[i-self.sequence_length:i, 0])
-            y_test.append(scaled_data[i, 0])
-
-        X_test, y_test = np.array(X_test), np.array(y_test)
-        X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
+        X_test, y_test = self._create_sequences(scaled_data)
 
         # Evaluate
         loss, mae, mape = self.model.evaluate(X_test, y_test, verbose=0)
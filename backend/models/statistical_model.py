@@ -0,0 +1,239 @@
+import zlib
+import numpy as np
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+
+from models.forecast_columns import columns_to_records
+
+def _hours_between(start: datetime, end: datetime) -> int:
+    return int((end - start).total_seconds() // 3600)
+
+class SeasonalNaiveForecaster:
+    name = "seasonal-naive"
+
+    def __init__(self, season_length: int = 24):
+        self.season_length = season_length
+
+    def forecast(self, history: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Repeat the last observed season for every series
+
+        history has shape (n_series, n_hours) with at least one hour;
+        returns point forecasts and standard deviations, both of shape
+        (n_series, horizon). Histories shorter than a season are tiled.
+        """
+        m = self.season_length
+        period = min(m, history.shape[1])
+        steps = np.arange(horizon)
+        point = history[:, -period:][:, steps % period]
+
+        # Seasonal differences estimate the one-season-ahead error
+        if history.shape[1] > m:
+            sigma = (history[:, m:] - history[:, :-m]).std(axis=1)
+        else:
+            sigma = history.std(axis=1)
+
+        seasons_ahead = steps // m + 1
+        return point, sigma[:, None] * np.sqrt(seasons_ahead)[None, :]
+
+class HoltWintersForecaster:
+    name = "holt-winters"
+
+    def __init__(self, season_length: int = 24, alpha: float = 0.3,
+                 beta: float = 0.02, gamma: float = 0.2, phi: float = 0.98):
+        self.season_length = season_length
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.phi = phi
+
+    def forecast(self, history: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Additive damped-trend Holt-Winters over all series at once
+
+        The recursion is sequential in time but every step updates all
+        series together, so cost grows with history length, not locations.
+        """
+        m = self.season_length
+        n_series, n_hours = history.shape
+        if n_hours < 2 * m:
+            return SeasonalNaiveForecaster(m).forecast(history, horizon)
+
+        # Initialise from the first two seasons
+        first = history[:, :m].mean(axis=1)
+        second = history[:, m:2 * m].mean(axis=1)
+        level = first
+        trend = (second - first) / m
+        seasonal = history[:, :m] - first[:, None]
+
+        a, b, g, phi = self.alpha, self.beta, self.gamma, self.phi
+        sq_error = np.zeros(n_series)
+        for t in range(n_hours):
+            idx = t % m
+            y = history[:, t]
+            s = seasonal[:, idx]
+            error = y - (level + phi * trend + s)
+            sq_error += error ** 2
+
+            new_level = a * (y - s) + (1 - a) * (level + phi * trend)
+            trend = b * (new_level - level) + (1 - b) * phi * trend
+            seasonal[:, idx] = g * (y - new_level) + (1 - g) * s
+            level = new_level
+
+        steps = np.arange(1, horizon + 1)
+        damping = np.cumsum(phi ** steps)
+        season_idx = (n_hours + steps - 1) % m
+        point = level[:, None] + damping[None, :] * trend[:, None] + seasonal[:, season_idx]
+
+        # Error variance grows with the horizon (random-walk approximation)
+        sigma = np.sqrt(sq_error / n_hours)
+        return point, sigma[:, None] * np.sqrt(1 + (steps - 1) * a ** 2)[None, :]
+
+class StatisticalPredictor:
+    """Fast forecasting tier used when the LSTM is untrained or too slow"""
+
+    def __init__(self, method: str = "holt-winters", season_length: int = 24,
+                 max_history_hours: int = 24 * 28):
+        if method == "seasonal-naive":
+            self.forecaster = SeasonalNaiveForecaster(season_length)
+        else:
+            self.forecaster = HoltWintersForecaster(season_length)
+        self.season_length = season_length
+        self.max_history_hours = max_history_hours
+        self.history: Dict[str, np.ndarray] = {}
+        # Hour following each location's last observed value
+        self.history_end: Dict[str, datetime] = {}
+
+    @property
+    def name(self) -> str:
+        return self.forecaster.name
+
+    def _seed_history(self, location: str, end: datetime) -> np.ndarray:
+        """Synthesise a daily consumption profile ending one hour before `end`
+
+        The noise is seeded by the location name, so a location without
+        actuals gets the same history every time and nothing is cached.
+        """
+        n_hours = self.max_history_hours
+        hours = (end.hour - n_hours + np.arange(n_hours)) % 24
+        base = np.select(
+            [hours < 6, hours < 12, hours < 18],
+            [200.0, 300.0, 400.0],
+            default=320.0
+        )
+        rng = np.random.default_rng(zlib.crc32(location.encode()))
+        return np.maximum(0, base + rng.normal(0, 0.1, n_hours) * base)
+
+    def observe(self, location: str, values: np.ndarray, start: Optional[datetime] = None):
+        """Record hourly actuals for a location beginning at `start`
+
+        Without `start` the values follow on from the last observed hour,
+        or end with the last complete hour for a new location.
+        Hours already held are overwritten, and gaps are filled from the
+        season before so the series keeps its hour-of-day phase.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        current = self.history.get(location)
+        end = self.history_end.get(location)
+        if start is None:
+            start = end or datetime.utcnow() - timedelta(hours=len(values))
+        start = start.replace(minute=0, second=0, microsecond=0)
+        stop = start + timedelta(hours=len(values))
+
+        if current is not None:
+            if _hours_between(end, stop) <= -self.max_history_hours:
+                return  # entirely older than the retained window
+            if _hours_between(end, start) >= self.max_history_hours:
+                current = None  # the gap spans the whole window
+
+        if current is None:
+            self.history[location] = values[-self.max_history_hours:]
+            self.history_end[location] = stop
+            return
+
+        held_start = end - timedelta(hours=len(current))
+        first, last = min(held_start, start), max(end, stop)
+        combined = np.full(_hours_between(first, last), np.nan)
+        offset = _hours_between(first, held_start)
+        combined[offset:offset + len(current)] = current
+        offset = _hours_between(first, start)
+        combined[offset:offset + len(values)] = values
+
+        m = self.season_length
+        for i in np.flatnonzero(np.isnan(combined)):
+            combined[i] = combined[i - m] if i >= m else np.nanmean(combined)
+
+        self.history[location] = combined[-self.max_history_hours:]
+        self.history_end[location] = last
+
+    def _aligned_history(self, location: str, base_time: datetime) -> Tuple[np.ndarray, int]:
+        """A location's history and how many hours before `base_time` it ends"""
+        if location not in self.history:
+            return self._seed_history(location, base_time), 0
+
+        values = self.history[location]
+        lead = _hours_between(self.history_end[location], base_time)
+        if lead < 0:
+            # Actuals already cover hours past base_time; forecast from base_time
+            values = values[:lead]
+            if not len(values):
+                return self._seed_history(location, base_time), 0
+            return values, 0
+
+        # Far beyond the history only the seasonal phase still matters
+        cap = self.max_history_hours
+        if lead > cap:
+            lead = cap - (cap - lead) % self.season_length
+        return values, lead
+
+    def forecast_array(self, locations: List[str], hours_ahead: int,
+                       base_time: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Point forecasts and standard deviations for every location at once
+
+        Histories ending before `base_time` are forecast through the
+        missing hours, so the returned steps always start at `base_time`.
+        """
+        base_time = (base_time or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+        # Only observed locations keep state; the rest are seeded per call
+        aligned = [self._aligned_history(loc, base_time) for loc in locations]
+        leads = np.array([lead for _, lead in aligned])
+
+        # Forecast series of equal length together, so one short history
+        # does not truncate every other location in the batch
+        lengths = np.array([len(values) for values, _ in aligned])
+        point = np.empty((len(locations), hours_ahead))
+        sigma = np.empty((len(locations), hours_ahead))
+        for length in np.unique(lengths):
+            rows = np.flatnonzero(lengths == length)
+            history = np.stack([aligned[row][0] for row in rows])
+            group_point, group_sigma = self.forecaster.forecast(history, hours_ahead + leads[rows].max())
+
+            steps = leads[rows, None] + np.arange(hours_ahead)
+            point[rows] = np.take_along_axis(group_point, steps, axis=1)
+            sigma[rows] = np.take_along_axis(group_sigma, steps, axis=1)
+
+        return np.maximum(0, point), sigma
+
+    def forecast_columns(self, locations: List[str], hours_ahead: int,
+                         base_time: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Forecast fields as (n_locations, hours_ahead) arrays"""
+        point, sigma = self.forecast_array(locations, hours_ahead, base_time)
+        return {
+            "predicted_value": point,
+            "confidence": np.clip(1 - sigma / np.maximum(point, 1), 0, 1),
+            "lower_bound": np.maximum(0, point - 1.96 * sigma),
+            "upper_bound": point + 1.96 * sigma
+        }
+
+    def predict_batch(self, locations: List[str], hours_ahead: int = 24) -> Dict[str, List[Dict]]:
+        """Generate predictions for several locations in one vectorized pass"""
+        base_time = datetime.utcnow()
+        columns = self.forecast_columns(locations, hours_ahead, base_time)
+        return {
+            location: columns_to_records(columns, row, base_time)
+            for row, location in enumerate(locations)
+        }
+
+    def predict(self, hours_ahead: int = 24, location: str = "default") -> List[Dict]:
+        """Generate energy consumption predictions for a single location"""
+        return self.predict_batch([location], hours_ahead)[location]
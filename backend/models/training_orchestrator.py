@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import re
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+def _artifact_prefix(checkpoint_dir: str, location: str) -> str:
+    # Sanitizing alone would map "a/b" and "a_b" to the same files
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", location)
+    digest = hashlib.sha1(location.encode()).hexdigest()[:8]
+    return os.path.join(checkpoint_dir, f"{safe}-{digest}")
+
+def _init_worker(threads: int):
+    """Pin TensorFlow's thread pools before it is first imported in this process"""
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def _train_location(location: str, history: np.ndarray, epochs: int, checkpoint_dir: str) -> Dict:
+    """Train and save one location's model inside a worker process"""
+    from models.lstm_model import LSTMPredictor
+
+    started = time.perf_counter()
+    predictor = LSTMPredictor()
+    fit = predictor.train(history, epochs=epochs, verbose=0)
+
+    prefix = _artifact_prefix(checkpoint_dir, location)
+    predictor.save_model(f"{prefix}.keras")
+    with open(f"{prefix}.scaler.pkl", "wb") as f:
+        pickle.dump(predictor.scaler, f)
+
+    return {
+        "loss": float(fit.history["loss"][-1]),
+        "seconds": round(time.perf_counter() - started, 2),
+        "model_path": f"{prefix}.keras"
+    }
+
+class TrainingOrchestrator:
+    """Trains one LSTM per location, sharded across a process pool
+
+    Each worker gets `threads_per_worker` TensorFlow threads so that
+    workers x threads never exceeds the cores available. Completed
+    locations are recorded in a manifest in `checkpoint_dir`; rerunning
+    after an interruption skips them. `train_fn` must be a module-level
+    function so spawned workers can unpickle it.
+    """
+
+    def __init__(self, checkpoint_dir: str, workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, epochs: int = 50,
+                 train_fn: Callable[[str, np.ndarray, int, str], Dict] = _train_location):
+        cpus = os.cpu_count() or 1
+        self.checkpoint_dir = checkpoint_dir
+        self.workers = workers or int(os.getenv('TRAINING_WORKERS', str(cpus)))
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.epochs = epochs
+        self.train_fn = train_fn
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.checkpoint_dir, MANIFEST)
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Locations already trained, with their results"""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Dict]):
+        # Write-then-rename so a crash never leaves a truncated manifest
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def train(self, histories: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+        """Train every location not yet in the manifest, returns the manifest"""
+        manifest = self.load_manifest()
+        pending = {
+            location: history for location, history in histories.items()
+            if location not in manifest
+        }
+        logger.info(f"Training {len(pending)} locations ({len(manifest)} already done) "
+                    f"on {self.workers} workers x {self.threads_per_worker} threads")
+        if not pending:
+            return manifest
+
+        # Spawn so each worker initialises TensorFlow with its own thread limits
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,)
+        ) as pool:
+            futures = {
+                pool.submit(self.train_fn, location, history, self.epochs, self.checkpoint_dir): location
+                for location, history in pending.items()
+            }
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    manifest[location] = future.result()
+                except Exception as e:
+                    logger.error(f"Training failed for {location}: {e}")
+                    continue
+                self._save_manifest(manifest)
+
+        return manifest
+
+    def load_predictor(self, location: str):
+        """Restore a trained location's model and scaler"""
+        from models.lstm_model import LSTMPredictor
+
+        prefix = _artifact_prefix(self.checkpoint_dir, location)
+        predictor = LSTMPredictor()
+        predictor.load_model(f"{prefix}.keras")
+        with open(f"{prefix}.scaler.pkl", "rb") as f:
+            predictor.scaler = pickle.load(f)
+        return predictor
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    # histories.npz holds one hourly array per location, keyed by location
+    histories_path, checkpoint_dir = sys.argv[1], sys.argv[2]
+    histories = dict(np.load(histories_path))
+
+    orchestrator = TrainingOrchestrator(checkpoint_dir)
+    results = orchestrator.train(histories)
+    print(json.dumps(results, indent=2))
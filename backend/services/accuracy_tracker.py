@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from models.backtester import Backtester
+
+logger = logging.getLogger(__name__)
+
+class AccuracyTracker:
+    """Reconciles observed consumption onto stored predictions and scores them
+
+    Every interval the MAE/MAPE of predictions reconciled over the trailing
+    window is computed in the database and written through
+    `PostgreSQLClient.update_metrics`, replacing the dashboard's constant.
+    Until any prediction in the window has been reconciled, the serving
+    model is backtested on the observed actuals and that accuracy is
+    published instead.
+    """
+
+    def __init__(self, postgres_client, lstm_model=None, fallback_model=None):
+        self.postgres_client = postgres_client
+        self.lstm_model = lstm_model
+        self.fallback_model = fallback_model
+        self.interval_seconds = int(os.getenv('ACCURACY_INTERVAL_SECONDS', '3600'))
+        self.window_hours = int(os.getenv('ACCURACY_WINDOW_HOURS', '168'))
+        self.backtest_hours = int(os.getenv('BACKTEST_WINDOW_HOURS', str(24 * 28)))
+        self.backtester = Backtester()
+        self._task: Optional[asyncio.Task] = None
+
+    def reconcile(self, location: str, start: datetime, values: List[float]) -> int:
+        """Attach hourly actuals beginning at `start` to matching predictions"""
+        if start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        start = start.replace(minute=0, second=0, microsecond=0)
+        observations = [
+            {
+                'location': location,
+                'timestamp': start + timedelta(hours=i),
+                'actual_value': float(value)
+            }
+            for i, value in enumerate(values)
+        ]
+        return self.postgres_client.reconcile_actuals(observations)
+
+    def refresh(self) -> dict:
+        """Score reconciled predictions in the window and publish the accuracy"""
+        since = datetime.utcnow() - timedelta(hours=self.window_hours)
+        accuracy = self.postgres_client.get_prediction_accuracy(since)
+        if accuracy:
+            self.postgres_client.record_accuracy(accuracy['mape'])
+            logger.info(f"Live accuracy over {accuracy['count']} predictions: "
+                        f"MAE {accuracy['mae']:.2f}, MAPE {accuracy['mape']:.2f}%")
+        return accuracy
+
+    def backtest(self) -> dict:
+        """Backtest the serving model on observed actuals and publish the accuracy
+
+        Only locations observed for every hour of the backtest window are
+        used, as the backtester needs gap-free series.
+        """
+        if self.lstm_model is not None and self.lstm_model.trained:
+            model = self.lstm_model
+        elif self.fallback_model is not None:
+            model = self.fallback_model
+        else:
+            return {}
+
+        end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(hours=self.backtest_hours)
+        _, matrix = self.postgres_client.get_observation_matrix(start, end)
+        history = matrix[~np.isnan(matrix).any(axis=1)]
+        if not len(history) or not self.backtester.cutoffs(history.shape[1]):
+            return {}
+
+        summary = self.backtester.run(model, history)
+        self.postgres_client.record_accuracy(summary['mape'])
+        logger.info(f"Backtest over {summary['series']} locations and {summary['cutoffs']} cutoffs: "
+                    f"MAE {summary['mae']:.2f}, MAPE {summary['mape']:.2f}%")
+        return summary
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                # Predictions stored after their actuals arrived are matched here
+                since = datetime.utcnow() - timedelta(hours=self.window_hours)
+                await asyncio.to_thread(self.postgres_client.reconcile_actuals, [], since)
+                if not await asyncio.to_thread(self.refresh):
+                    await asyncio.to_thread(self.backtest)
+            except Exception as e:
+                logger.error(f"Accuracy refresh failed: {e}")
+
+    def start(self):
+        """Start the background accuracy loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background accuracy loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,303 @@
+import asyncio
+import glob
+import logging
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("created_at", pa.timestamp("us")),
+    ("timestamp", pa.timestamp("us")),
+    ("location", pa.string()),
+    ("predicted_value", pa.float64()),
+    ("actual_value", pa.float64()),
+    ("confidence", pa.float64()),
+    ("model_version", pa.string()),
+])
+
+OBSERVATIONS_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("location", pa.string()),
+    ("actual_value", pa.float64()),
+])
+
+MONGO_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("time", pa.string()),
+    ("location", pa.string()),
+    ("predicted_value", pa.float64()),
+    ("confidence", pa.float64()),
+    ("lower_bound", pa.float64()),
+    ("upper_bound", pa.float64()),
+    ("model_version", pa.string()),
+])
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Partitions and stored timestamps are naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class PredictionArchive:
+    """Compressed Parquet files of archived predictions, partitioned by day
+
+    Layout: <root>/<source>/date=YYYY-MM-DD/part-<first key>.parquet. A
+    part is named after the key of its first row, so archiving a batch
+    again after a failed delete overwrites the earlier part instead of
+    duplicating it. Reads only open the partitions overlapping the
+    requested range and memory-map them, so archived history costs no
+    resident memory until touched.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write(self, source: str, rows: List[Dict], schema: pa.Schema,
+              partition_by: str = "created_at") -> int:
+        """Write key-ordered rows to their day partitions, returns the number written"""
+        by_day: Dict[str, List[Dict]] = {}
+        for row in rows:
+            by_day.setdefault(row[partition_by].strftime("%Y-%m-%d"), []).append(row)
+
+        key = schema.names[0]
+        for day, day_rows in by_day.items():
+            directory = os.path.join(self.root, source, f"date={day}")
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_pylist(day_rows, schema=schema)
+
+            # Zero-padded so parts sort in key order
+            first = day_rows[0][key]
+            name = f"part-{first:020d}" if isinstance(first, int) else f"part-{first}"
+
+            # Write under a temporary name so readers never see partial files
+            path = os.path.join(directory, f"{name}.parquet")
+            pq.write_table(table, f"{path}.tmp", compression="zstd")
+            os.replace(f"{path}.tmp", path)
+
+        return len(rows)
+
+    def _files(self, source: str, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        files = []
+        for directory in sorted(glob.glob(os.path.join(self.root, source, "date=*"))):
+            day = datetime.strptime(os.path.basename(directory)[len("date="):], "%Y-%m-%d")
+            if start and day + timedelta(days=1) <= start:
+                continue
+            if end and day >= end:
+                continue
+            files.extend(sorted(glob.glob(os.path.join(directory, "*.parquet"))))
+        return files
+
+    @staticmethod
+    def _row_groups(parquet_file: pq.ParquetFile, start: Optional[datetime],
+                    end: Optional[datetime]) -> List[int]:
+        """Row groups whose created_at statistics overlap [start, end)"""
+        column = parquet_file.schema_arrow.get_field_index("created_at")
+        row_groups = []
+        for i in range(parquet_file.num_row_groups):
+            stats = parquet_file.metadata.row_group(i).column(column).statistics
+            if stats is not None and stats.has_min_max:
+                if (start and stats.max < start) or (end and stats.min >= end):
+                    continue
+            row_groups.append(i)
+        return row_groups
+
+    def scan(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             location: Optional[str] = None, columns: Optional[List[str]] = None,
+             source: str = "postgres", after: Optional[Tuple[datetime, int]] = None) -> Iterator[pa.Table]:
+        """Archived rows in [start, end) after the `after` key, one table per file
+
+        Partitions outside the range are skipped by name and row groups by
+        their statistics before any data is read. Parts never overlap in
+        (created_at, id) order, since the oldest rows are always archived
+        first, so callers wanting only the first rows can stop early.
+        """
+        start, end = _naive_utc(start), _naive_utc(end)
+        if after:
+            after = (_naive_utc(after[0]), after[1])
+            start = max(start, after[0]) if start else after[0]
+
+        sort_keys = [("created_at", "ascending")]
+        if source == "postgres" and (columns is None or "id" in columns):
+            sort_keys.append(("id", "ascending"))
+
+        for path in self._files(source, start, end):
+            parquet_file = pq.ParquetFile(path, memory_map=True)
+            row_groups = self._row_groups(parquet_file, start, end)
+            if not row_groups:
+                continue
+            table = parquet_file.read_row_groups(row_groups, columns=columns)
+
+            mask = None
+            if start:
+                mask = pc.greater_equal(table["created_at"], pa.scalar(start, pa.timestamp("us")))
+            if end:
+                condition = pc.less(table["created_at"], pa.scalar(end, pa.timestamp("us")))
+                mask = condition if mask is None else pc.and_(mask, condition)
+            if location:
+                condition = pc.equal(table["location"], location)
+                mask = condition if mask is None else pc.and_(mask, condition)
+            if after:
+                created_at = pa.scalar(after[0], pa.timestamp("us"))
+                condition = pc.or_(
+                    pc.greater(table["created_at"], created_at),
+                    pc.and_(pc.equal(table["created_at"], created_at), pc.greater(table["id"], after[1]))
+                )
+                mask = condition if mask is None else pc.and_(mask, condition)
+            if mask is not None:
+                table = table.filter(mask)
+
+            if table.num_rows:
+                yield table.sort_by(sort_keys)
+
+    def read(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             location: Optional[str] = None, columns: Optional[List[str]] = None,
+             source: str = "postgres", after: Optional[Tuple[datetime, int]] = None,
+             limit: Optional[int] = None) -> pa.Table:
+        """Archived rows in [start, end), ordered by (created_at, id)
+
+        With `limit`, reading stops once that many rows have been found.
+        """
+        schema = POSTGRES_SCHEMA if source == "postgres" else MONGO_SCHEMA
+        if columns is not None:
+            schema = pa.schema([schema.field(c) for c in columns])
+
+        tables, rows = [], 0
+        with timed("archive"):
+            for table in self.scan(start, end, location, columns, source, after):
+                tables.append(table)
+                rows += table.num_rows
+                if limit is not None and rows >= limit:
+                    break
+
+        if not tables:
+            return schema.empty_table()
+        table = pa.concat_tables(tables)
+        return table if limit is None else table.slice(0, limit)
+
+    def get_page(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 location: Optional[str] = None, after: Optional[Tuple[datetime, int]] = None,
+                 limit: int = 1000) -> List[Dict]:
+        """Keyset page of archived PostgreSQL predictions, like get_prediction_page"""
+        return self.read(start, end, location, after=after, limit=limit).to_pylist()
+
+    def get_series(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   location: Optional[str] = None, max_points: int = 200000) -> Dict:
+        """Target hour, predicted and actual values as arrays, at most `max_points`"""
+        columns = ["created_at", "timestamp", "location", "predicted_value", "actual_value"]
+        table = self.read(start, end, location, columns=columns, limit=max_points)
+        return {
+            "timestamp": table["timestamp"].to_numpy().astype("datetime64[us]"),
+            "predicted_value": table["predicted_value"].to_numpy(zero_copy_only=False).astype(float),
+            "actual_value": table["actual_value"].fill_null(np.nan).to_numpy(zero_copy_only=False).astype(float),
+            "truncated": table.num_rows >= max_points
+        }
+
+class RetentionJob:
+    """Moves predictions and observations older than the retention age to Parquet
+
+    Each batch is written to the archive before it is deleted, so a crash
+    can at worst leave a batch in both places, never in neither; the next
+    run then rewrites the same part rather than adding a duplicate.
+    Observations are partitioned by the hour they were observed for.
+    """
+
+    def __init__(self, archive: PredictionArchive, postgres_client=None, mongo_client=None):
+        self.archive = archive
+        self.postgres_client = postgres_client
+        self.mongo_client = mongo_client
+        self.retention_days = int(os.getenv('RETENTION_DAYS', '30'))
+        self.batch_size = int(os.getenv('ARCHIVE_BATCH_SIZE', '10000'))
+        self.interval_seconds = int(os.getenv('ARCHIVE_INTERVAL_SECONDS', '86400'))
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(days=self.retention_days)
+
+    def _archive_postgres(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            rows = self.postgres_client.get_prediction_page(end=cutoff, limit=self.batch_size)
+            if not rows:
+                return archived
+            self.archive.write("postgres", [
+                {field.name: getattr(row, field.name) for field in POSTGRES_SCHEMA}
+                for row in rows
+            ], POSTGRES_SCHEMA)
+            if not self.postgres_client.delete_predictions([row.id for row in rows]):
+                return archived
+            archived += len(rows)
+
+    def _archive_observations(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            rows = self.postgres_client.get_observations_before(cutoff, self.batch_size)
+            if not rows:
+                return archived
+            self.archive.write("observations", [
+                {field.name: getattr(row, field.name) for field in OBSERVATIONS_SCHEMA}
+                for row in rows
+            ], OBSERVATIONS_SCHEMA, partition_by="timestamp")
+            if not self.postgres_client.delete_observations([row.id for row in rows]):
+                return archived
+            archived += len(rows)
+
+    def _archive_mongo(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            docs = self.mongo_client.get_predictions_before(cutoff, self.batch_size)
+            if not docs:
+                return archived
+            self.archive.write("mongo", [
+                {**{field.name: doc.get(field.name) for field in MONGO_SCHEMA}, "_id": str(doc["_id"])}
+                for doc in docs
+            ], MONGO_SCHEMA)
+            if not self.mongo_client.delete_predictions([doc["_id"] for doc in docs]):
+                return archived
+            archived += len(docs)
+
+    def run_once(self) -> Dict[str, int]:
+        """Archive and delete everything older than the retention cutoff"""
+        cutoff = self.cutoff
+        result = {}
+        if self.postgres_client:
+            result["postgres"] = self._archive_postgres(cutoff)
+            result["observations"] = self._archive_observations(cutoff)
+        if self.mongo_client:
+            result["mongo"] = self._archive_mongo(cutoff)
+        logger.info(f"Archived rows older than {cutoff.isoformat()}: {result}")
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Prediction archival failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start the background retention loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background retention loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
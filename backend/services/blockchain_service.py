@@ -4,20 +4,24 @@ import json
 import os
 from datetime import datetime
 
+from services.instrumentation import timed
+
 class BlockchainService:
-    def __init__(self):
+    def __init__(self, provider=None):
         # Connect to Ethereum network (use Infura or local node)
         self.w3 = None
         self.contract = None
         self.contract_address = os.getenv('CONTRACT_ADDRESS', '0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb2')
-        self._initialize_connection()
+        self._initialize_connection(provider)
 
-    def _initialize_connection(self):
-        """Initialize Web3 connection"""
+    def _initialize_connection(self, provider=None):
+        """Initialize Web3 connection, optionally through an explicit provider"""
         try:
-            # Try to connect to local node or Infura
-            infura_url = os.getenv('INFURA_URL', 'https://sepolia.infura.io/v3/YOUR_PROJECT_ID')
-            self.w3 = Web3(Web3.HTTPProvider(infura_url))
+            if provider is None:
+                # Try to connect to local node or Infura
+                infura_url = os.getenv('INFURA_URL', 'https://sepolia.infura.io/v3/YOUR_PROJECT_ID')
+                provider = Web3.HTTPProvider(infura_url)
+            self.w3 = Web3(provider)
 
             if self.w3.is_connected():
                 print("✅ Connected to Ethereum network")
@@ -56,14 +60,16 @@ class BlockchainService:
             }
 
         try:
-            block_number = self.w3.eth.block_number
-            gas_price = self.w3.eth.gas_price
+            with timed("chain_rpc"):
+                block_number = self.w3.eth.block_number
+                gas_price = self.w3.eth.gas_price
+                chain_id = self.w3.eth.chain_id
             gas_price_gwei = self.w3.from_wei(gas_price, 'gwei')
 
             return {
                 "blockNumber": block_number,
                 "gasPrice": float(gas_price_gwei),
-                "networkId": self.w3.eth.chain_id,
+                "networkId": chain_id,
                 "recentTransactions": self._get_recent_transactions()
             }
         except Exception as e:
@@ -101,24 +107,25 @@ class BlockchainService:
                 abi=contract_abi
             )
 
-            # Get account
-            account = self.w3.eth.accounts[0]
-
-            # Build transaction
-            tx = contract.functions.storePrediction(
-                int(prediction),
-                "LSTM-v1.0",
-                95  # confidence
-            ).build_transaction({
-                'from': account,
-                'nonce': self.w3.eth.get_transaction_count(account),
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price
-            })
-
-            # Sign and send transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=os.getenv('PRIVATE_KEY'))
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            with timed("chain_rpc"):
+                # Get account
+                account = self.w3.eth.accounts[0]
+
+                # Build transaction
+                tx = contract.functions.storePrediction(
+                    int(prediction),
+                    "LSTM-v1.0",
+                    95  # confidence
+                ).build_transaction({
+                    'from': account,
+                    'nonce': self.w3.eth.get_transaction_count(account),
+                    'gas': 200000,
+                    'gasPrice': self.w3.eth.gas_price
+                })
+
+                # Sign and send transaction
+                signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=os.getenv('PRIVATE_KEY'))
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
 
             return self.w3.to_hex(tx_hash)
 
@@ -150,7 +157,8 @@ class BlockchainService:
 
         try:
             # Call contract method
-            prediction = self.contract.functions.getLatestPrediction().call()
+            with timed("chain_rpc"):
+                prediction = self.contract.functions.getLatestPrediction().call()
             return {
                 "timestamp": prediction[0],
                 "value": prediction[1],
@@ -0,0 +1,62 @@
+import numpy as np
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `n_out` visually salient points
+
+    x must be sorted ascending. The first and last points are always kept;
+    from each interior bucket the point forming the largest triangle with
+    the previously kept point and the next bucket's mean is chosen.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    # Interior buckets split points 1..n-2; edges[-1] == n - 1
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    kept = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+
+        areas = np.abs(
+            (x[kept] - next_x) * (y[start:stop] - y[kept])
+            - (x[kept] - x[start:stop]) * (next_y - y[kept])
+        )
+        kept = start + int(np.argmax(areas))
+        indices[i + 1] = kept
+
+    return indices
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the min and max of `n_out // 2` equal-width time buckets
+
+    Preserves every peak and trough, at the cost of a less even shape than LTTB.
+    """
+    n = len(x)
+    n_buckets = max(1, n_out // 2)
+    if n <= n_out:
+        return np.arange(n)
+
+    x = x.astype(float)
+    span = max(x[-1] - x[0], 1e-9)
+    buckets = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+    # Sort by (bucket, y): each bucket's first entry is its min, last its max
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    first = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+
+    return np.unique(np.concatenate([order[first], order[last]]))
+
+DOWNSAMPLERS = {
+    "lttb": lttb_indices,
+    "minmax": minmax_indices,
+}
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from models.forecast_columns import FIELDS, columns_to_records
+from services.instrumentation import timed, FORECAST_LOCATIONS
+
+logger = logging.getLogger(__name__)
+
+class ForecastStore:
+    """Columnar in-memory store of the latest precomputed forecasts
+
+    Each field is one float32 array of shape (n_locations, horizon_hours).
+    A refresh builds a complete new snapshot and swaps it in with a single
+    assignment, so readers never see a half-written forecast.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[Dict] = None
+
+    def publish(self, locations: List[str], base_time: datetime,
+                columns: Dict[str, np.ndarray], model_version: str, tier: str):
+        """Replace the current snapshot"""
+        self._snapshot = {
+            "index": {location: row for row, location in enumerate(locations)},
+            "base_time": base_time,
+            "columns": {field: np.asarray(columns[field], dtype=np.float32) for field in FIELDS},
+            "model_version": model_version,
+            "tier": tier
+        }
+
+    @property
+    def base_time(self) -> Optional[datetime]:
+        return self._snapshot["base_time"] if self._snapshot else None
+
+    def lookup(self, location: str, hours: int, now: Optional[datetime] = None) -> Optional[Dict]:
+        """Slice the next `hours` of a location's forecast, None on a miss"""
+        snapshot = self._snapshot
+        if snapshot is None or location not in snapshot["index"]:
+            return None
+
+        now = now or datetime.utcnow()
+        start = int((now - snapshot["base_time"]).total_seconds() // 3600)
+        stop = start + hours
+        if start < 0 or stop > snapshot["columns"]["predicted_value"].shape[1]:
+            return None
+
+        row = snapshot["index"][location]
+        return {
+            "base_time": snapshot["base_time"] + timedelta(hours=start),
+            "columns": {
+                field: values[row:row + 1, start:stop]
+                for field, values in snapshot["columns"].items()
+            },
+            "model_version": snapshot["model_version"],
+            "tier": snapshot["tier"]
+        }
+
+class ForecastScheduler:
+    """Precomputes rolling forecasts for every known location each interval
+
+    Configured locations are always precomputed. Locations registered by
+    requests are added up to `max_locations` and dropped again once they
+    have not been requested for `location_ttl_seconds`.
+
+    Each target hour is persisted once, when it first enters a location's
+    horizon, so a refresh writes one new hour per location rather than the
+    whole snapshot again.
+    """
+
+    def __init__(self, store: ForecastStore, lstm_model, fallback_model, mongo_client=None,
+                 postgres_client=None, locations: Optional[List[str]] = None):
+        self.store = store
+        self.lstm_model = lstm_model
+        self.fallback_model = fallback_model
+        self.mongo_client = mongo_client
+        self.postgres_client = postgres_client
+        # Cover the longest on-demand request, plus a day of slack for late refreshes
+        max_request_hours = int(os.getenv('MAX_PREDICTION_HOURS', '720'))
+        self.horizon_hours = int(os.getenv('FORECAST_HORIZON_HOURS', str(max_request_hours + 24)))
+        self.interval_seconds = int(os.getenv('FORECAST_INTERVAL_SECONDS', '3600'))
+        self.batch_size = int(os.getenv('FORECAST_BATCH_SIZE', '256'))
+        self.max_locations = int(os.getenv('FORECAST_MAX_LOCATIONS', '1000'))
+        self.location_ttl_seconds = int(os.getenv('FORECAST_LOCATION_TTL_HOURS', '24')) * 3600
+        self.configured: Set[str] = set(locations or ["default"])
+        self._requested: Dict[str, float] = {}
+        self._stored_until: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def locations(self) -> List[str]:
+        """Locations the next refresh will forecast, sorted"""
+        with self._lock:
+            return sorted(self.configured.union(self._requested))
+
+    def register(self, location: str) -> bool:
+        """Mark a location as requested, returns whether it is precomputed"""
+        with self._lock:
+            if location in self.configured:
+                return True
+            if location not in self._requested and len(self._requested) >= self.max_locations:
+                return False
+            self._requested[location] = time.monotonic()
+            return True
+
+    def expire(self) -> List[str]:
+        """Drop requested locations not seen within the TTL, returns them"""
+        cutoff = time.monotonic() - self.location_ttl_seconds
+        with self._lock:
+            expired = [location for location, seen in self._requested.items() if seen < cutoff]
+            for location in expired:
+                del self._requested[location]
+                self._stored_until.pop(location, None)
+        return expired
+
+    def refresh(self, base_time: Optional[datetime] = None):
+        """Forecast all locations in batches and publish one new snapshot"""
+        base_time = base_time or datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        expired = self.expire()
+        if expired:
+            logger.info(f"Stopped precomputing {len(expired)} unrequested locations")
+        locations = self.locations
+
+        if self.lstm_model.trained:
+            model, model_version, tier = self.lstm_model, "LSTM-v1.0", "lstm"
+        else:
+            model = self.fallback_model
+            model_version, tier = f"{model.name}-v1.0", model.name
+
+        with timed("precompute"):
+            batches = [
+                model.forecast_columns(locations[i:i + self.batch_size], self.horizon_hours, base_time)
+                for i in range(0, len(locations), self.batch_size)
+            ]
+        columns = {
+            field: np.concatenate([batch[field] for batch in batches])
+            for field in FIELDS
+        }
+        self.store.publish(locations, base_time, columns, model_version, tier)
+        FORECAST_LOCATIONS.set(len(locations))
+
+        records = self._new_records(locations, base_time, columns)
+        if records and self.mongo_client:
+            self.mongo_client.store_predictions(records, model_version)
+        if records and self.postgres_client:
+            self.postgres_client.store_predictions(records, model_version)
+
+        logger.info(f"Precomputed {self.horizon_hours}h forecasts for {len(locations)} locations")
+
+    def _new_records(self, locations: List[str], base_time: datetime,
+                     columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Prediction records for the hours not yet persisted, across all locations"""
+        horizon_end = base_time + timedelta(hours=self.horizon_hours)
+        records = []
+        for row, location in enumerate(locations):
+            stored_until = self._stored_until.get(location, base_time)
+            start = max(0, int((stored_until - base_time).total_seconds() // 3600))
+            for record in columns_to_records(columns, row, base_time, start):
+                record["location"] = location
+                records.append(record)
+            self._stored_until[location] = max(stored_until, horizon_end)
+        return records
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Forecast precomputation failed: {e}")
+
+            # Sleep until the top of the next interval
+            await asyncio.sleep(self.interval_seconds - time.time() % self.interval_seconds)
+
+    def start(self):
+        """Start the background refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background refresh loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+STAGE_LATENCY = Histogram(
+    "energy_stage_latency_seconds",
+    "Latency of request pipeline stages",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+FORECAST_CACHE = Counter(
+    "energy_forecast_cache_total",
+    "Forecast store lookups by result",
+    ["result"]
+)
+FORECAST_LOCATIONS = Gauge(
+    "energy_forecast_locations",
+    "Locations held in the precomputed forecast store"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "energy_db_pool_checked_out",
+    "PostgreSQL connections currently checked out of the pool"
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "energy_websocket_connections",
+    "Open /ws/stream connections"
+)
+EVENT_LOOP_LAG = Gauge(
+    "energy_event_loop_lag_seconds",
+    "Delay of the most recent event loop heartbeat"
+)
+
+# Label lookups are cached so a timed block costs two perf_counter calls
+_stage_histograms: Dict[str, object] = {}
+
+class timed:
+    """Record the wall time of a block under a stage label
+
+        with timed("inference"):
+            ...
+    """
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, stage: str):
+        histogram = _stage_histograms.get(stage)
+        if histogram is None:
+            histogram = _stage_histograms[stage] = STAGE_LATENCY.labels(stage)
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+async def monitor_event_loop_lag(interval: float = 1.0):
+    """Measure how late the loop wakes from a fixed sleep, forever"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - started - interval))
+
+def render_metrics():
+    """Prometheus exposition body and its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import threading
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+class OnlineTrainer:
+    """Keeps the LSTM fresh by fine-tuning on streamed actuals in the background
+
+    Actuals are buffered per location, keyed by hour, as they arrive.
+    Every interval each contiguous run of buffered hours is handed to
+    `LSTMPredictor.fine_tune` in a worker thread, prefixed with the last
+    `sequence_length` hours seen when it directly follows them. A batch
+    whose fine-tuning fails is put back for the next interval.
+
+    At most `max_locations` locations are accepted and each buffers its
+    latest `max_pending_hours` hours, so the buffer is bounded in total.
+    While the LSTM is untrained, buffered actuals are discarded each
+    interval as there is nothing to fine-tune.
+    """
+
+    def __init__(self, lstm_model, fallback_model=None):
+        self.lstm_model = lstm_model
+        self.fallback_model = fallback_model
+        self.interval_seconds = int(os.getenv('FINE_TUNE_INTERVAL_SECONDS', '3600'))
+        self.epochs = int(os.getenv('FINE_TUNE_EPOCHS', '3'))
+        self.min_new_hours = int(os.getenv('FINE_TUNE_MIN_HOURS', '24'))
+        self.max_pending_hours = int(os.getenv('FINE_TUNE_MAX_PENDING_HOURS', '168'))
+        self.max_locations = int(os.getenv('FINE_TUNE_MAX_LOCATIONS', '1000'))
+        self._locations: Set[str] = set()
+        self._pending: Dict[str, Dict[datetime, float]] = {}
+        # Per location: the hour after the last seen value, and the values before it
+        self._context: Dict[str, Tuple[datetime, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, location: str, values: List[float], start: Optional[datetime] = None) -> bool:
+        """Queue hourly actuals for a location beginning at `start`
+
+        Without `start` the values are taken to end with the last complete hour.
+        A value for an hour that is already pending replaces it. Returns False,
+        queuing nothing, for a new location once `max_locations` are tracked.
+        """
+        if start is None:
+            start = datetime.utcnow() - timedelta(hours=len(values))
+        elif start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        start = start.replace(minute=0, second=0, microsecond=0)
+
+        with self._lock:
+            if location not in self._locations:
+                if len(self._locations) >= self.max_locations:
+                    return False
+                self._locations.add(location)
+            pending = self._pending.setdefault(location, {})
+            for i, value in enumerate(values):
+                pending[start + timedelta(hours=i)] = float(value)
+            self._trim(pending)
+        if self.fallback_model is not None:
+            self.fallback_model.observe(location, values, start)
+        return True
+
+    def _trim(self, pending: Dict[datetime, float]):
+        """Drop a location's oldest pending hours beyond `max_pending_hours`"""
+        excess = len(pending) - self.max_pending_hours
+        if excess > 0:
+            for hour in sorted(pending)[:excess]:
+                del pending[hour]
+
+    @property
+    def pending_hours(self) -> int:
+        with self._lock:
+            return sum(len(values) for values in self._pending.values())
+
+    def _drain(self) -> Dict[str, Dict[datetime, float]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _requeue(self, pending: Dict[str, Dict[datetime, float]]):
+        """Put a batch back, keeping values submitted since for the same hours"""
+        with self._lock:
+            for location, values in pending.items():
+                self._pending[location] = {**values, **self._pending.get(location, {})}
+                self._trim(self._pending[location])
+
+    def _series(self, pending: Dict[str, Dict[datetime, float]]):
+        """Contiguous runs of pending hours and each location's next context"""
+        context_length = self.lstm_model.sequence_length
+        series, contexts = [], {}
+        for location, by_hour in pending.items():
+            hours = sorted(by_hour)
+            values = np.array([by_hour[hour] for hour in hours])
+            offsets = np.array([(hour - hours[0]) // timedelta(hours=1) for hour in hours])
+            breaks = np.flatnonzero(np.diff(offsets) != 1) + 1
+
+            context_end, context = self._context.get(location, (None, np.empty(0)))
+            for run_offsets, run in zip(np.split(offsets, breaks), np.split(values, breaks)):
+                run_start = hours[0] + timedelta(hours=int(run_offsets[0]))
+                run_end = run_start + timedelta(hours=len(run))
+                if run_start == context_end:
+                    run = np.concatenate([context, run])
+                series.append(run)
+
+                # Late or repeated hours leave the newer context in place
+                if context_end is None or run_end > context_end:
+                    context_end, context = run_end, run[-context_length:]
+            contexts[location] = (context_end, context)
+        return series, contexts
+
+    def run_once(self) -> bool:
+        """Fine-tune on everything buffered so far, returns whether it trained"""
+        if not self.lstm_model.trained:
+            self._drain()
+            return False
+        if self.pending_hours < self.min_new_hours:
+            return False
+
+        pending = self._drain()
+        series, contexts = self._series(pending)
+        try:
+            with timed("fine_tune"):
+                history = self.lstm_model.fine_tune(series, epochs=self.epochs)
+        except Exception:
+            self._requeue(pending)
+            raise
+        self._context.update(contexts)
+
+        if history is None:
+            return False
+        logger.info(f"Fine-tuned LSTM on {sum(len(s) for s in series)} hours "
+                    f"(update #{self.lstm_model.fine_tune_count})")
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Online fine-tuning failed: {e}")
+
+    def start(self):
+        """Start the background fine-tuning loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background fine-tuning loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
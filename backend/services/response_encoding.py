@@ -0,0 +1,149 @@
+import json
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from models.forecast_columns import FIELDS
+
+# Optional fast encoders; formats whose library is missing are not offered
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.energy.columnar+json",
+    "msgpack": "application/x-msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+STEP_SECONDS = 3600
+
+class UnsupportedEncoding(Exception):
+    pass
+
+def available_encodings() -> Dict[str, str]:
+    """Formats this process can produce, keyed by name"""
+    available = {"json": MEDIA_TYPES["json"], "columnar": MEDIA_TYPES["columnar"]}
+    if msgpack is not None:
+        available["msgpack"] = MEDIA_TYPES["msgpack"]
+    if pa is not None:
+        available["arrow"] = MEDIA_TYPES["arrow"]
+    return available
+
+def negotiate_encoding(accept: Optional[str], format: Optional[str] = None) -> str:
+    """Pick a response format from an explicit ?format= or the Accept header"""
+    available = available_encodings()
+    if format:
+        if format not in available:
+            raise UnsupportedEncoding(f"Unsupported format '{format}', expected one of {sorted(available)}")
+        return format
+
+    # First listed media type we can produce wins; q-values are not weighed
+    by_media_type = {media_type: name for name, media_type in available.items()}
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip()
+        if media_type in by_media_type:
+            return by_media_type[media_type]
+
+    return "json"
+
+def _dumps(payload: Dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+def _columnar_payload(forecast: Dict) -> Dict:
+    return {
+        "locations": forecast["locations"],
+        "start": forecast["base_time"].isoformat(),
+        "step_seconds": STEP_SECONDS,
+        "hours": int(forecast["columns"]["predicted_value"].shape[1]),
+        "model_version": forecast["model_version"],
+        "tier": forecast["tier"],
+        "confidence": forecast["confidence"],
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+def _encode_columnar(forecast: Dict) -> bytes:
+    payload = _columnar_payload(forecast)
+    columns = {field: np.asarray(forecast["columns"][field], dtype=np.float32) for field in FIELDS}
+
+    if orjson is not None:
+        payload.update(columns)
+    else:
+        payload.update({field: np.round(values, 3).tolist() for field, values in columns.items()})
+    return _dumps(payload)
+
+def _encode_msgpack(forecast: Dict) -> bytes:
+    """Columns travel as raw little-endian float32 buffers of shape (locations, hours)"""
+    payload = _columnar_payload(forecast)
+    payload["dtype"] = "<f4"
+    for field in FIELDS:
+        payload[field] = np.ascontiguousarray(forecast["columns"][field], dtype="<f4").tobytes()
+    return msgpack.packb(payload, use_bin_type=True)
+
+def _encode_arrow(forecast: Dict) -> bytes:
+    """One row per (location, hour) in an Arrow IPC stream"""
+    columns = forecast["columns"]
+    n_locations, hours = columns["predicted_value"].shape
+
+    start = np.datetime64(forecast["base_time"].replace(tzinfo=None), "s")
+    times = start + np.arange(hours) * np.timedelta64(STEP_SECONDS, "s")
+    location_codes = np.repeat(np.arange(n_locations, dtype=np.int32), hours)
+
+    arrays = [
+        pa.DictionaryArray.from_arrays(location_codes, pa.array(forecast["locations"])),
+        pa.array(np.tile(times, n_locations), type=pa.timestamp("s")),
+    ] + [pa.array(np.asarray(columns[field], dtype=np.float32).ravel()) for field in FIELDS]
+    names = ["location", "time"] + list(FIELDS)
+
+    metadata = {"model_version": forecast["model_version"], "tier": forecast["tier"]}
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    schema = batch.schema.with_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(metadata))
+    return sink.getvalue().to_pybytes()
+
+def iter_ndjson(forecast: Dict, chunk_hours: int = 168) -> Iterator[bytes]:
+    """Yield one NDJSON line per location and block of `chunk_hours` hours"""
+    columns = forecast["columns"]
+    hours = columns["predicted_value"].shape[1]
+
+    for row, location in enumerate(forecast["locations"]):
+        for start in range(0, hours, chunk_hours):
+            stop = min(start + chunk_hours, hours)
+            line = {
+                "location": location,
+                "start": (forecast["base_time"] + timedelta(hours=start)).isoformat(),
+                "step_seconds": STEP_SECONDS,
+                "model_version": forecast["model_version"],
+                "tier": forecast["tier"],
+            }
+            for field in FIELDS:
+                values = np.asarray(columns[field][row, start:stop], dtype=np.float32)
+                line[field] = values if orjson is not None else np.round(values, 3).tolist()
+            yield _dumps(line) + b"\n"
+
+ENCODERS = {
+    "columnar": _encode_columnar,
+    "msgpack": _encode_msgpack,
+    "arrow": _encode_arrow,
+}
+
+def encode_forecast(forecast: Dict, encoding: str) -> Tuple[bytes, str]:
+    """Serialize a columnar forecast, returning the body and its media type"""
+    return ENCODERS[encoding](forecast), MEDIA_TYPES[encoding]
@@ -1,5 +1,5 @@
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, window, avg, sum as spark_sum, count
+from pyspark.sql.functions import col, window, avg, sum as spark_sum, count, from_json, lit, concat, rand
 from pyspark.sql.types import StructType, StructField, StringType, DoubleType, TimestampType
 import logging
 
@@ -48,7 +48,28 @@ class SparkStreamProcessor:
             .select("data.*")
 
         # Aggregate data in 5-minute windows
-        aggregated_df = parsed_df \
+        return self.aggregate_stream(parsed_df)
+
+    def process_rate_stream(self, rows_per_second: int = 1000, num_locations: int = 10):
+        """Generate synthetic energy readings from Spark's built-in rate source"""
+        df = self.spark \
+            .readStream \
+            .format("rate") \
+            .option("rowsPerSecond", rows_per_second) \
+            .load()
+
+        return df.select(
+            col("timestamp"),
+            concat(lit("sensor-"), (col("value") % 100).cast("string")).alias("sensor_id"),
+            concat(lit("location-"), (col("value") % num_locations).cast("string")).alias("location"),
+            (200 + rand() * 300).alias("energy_consumption"),
+            (10 + rand() * 20).alias("temperature"),
+            (30 + rand() * 50).alias("humidity")
+        )
+
+    def aggregate_stream(self, parsed_df):
+        """Aggregate energy readings per location in 5-minute windows"""
+        return parsed_df \
             .withWatermark("timestamp", "10 minutes") \
             .groupBy(
                 window("timestamp", "5 minutes"),
@@ -61,8 +82,6 @@ class SparkStreamProcessor:
                 avg("temperature").alias("avg_temperature")
             )
 
-        return aggregated_df
-
     def process_socket_stream(self, host: str = "localhost", port: int = 9999):
         """Process real-time data from socket"""
         lines = self.spark \
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from database.postgres_client import PostgreSQLClient, Prediction, Metrics
+from models.statistical_model import StatisticalPredictor
+from services.accuracy_tracker import AccuracyTracker
+
+BASE_TIME = datetime(2026, 1, 1, 5)
+
+@pytest.fixture
+def postgres_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSTGRESQL_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    client = PostgreSQLClient()
+    yield client
+    client.close()
+
+def store(client, location, hours, value=100.0):
+    client.store_predictions([
+        {"time": (BASE_TIME + timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S"),
+         "predicted_value": value, "location": location}
+        for h in range(hours)
+    ])
+
+def actuals(client):
+    return {
+        (p.location, p.timestamp): p.actual_value
+        for p in client.session.query(Prediction).all()
+    }
+
+def test_aware_start_is_converted_to_utc(postgres_client):
+    store(postgres_client, "a", 1)
+    tracker = AccuracyTracker(postgres_client)
+
+    start = datetime(2026, 1, 1, 7, tzinfo=timezone(timedelta(hours=2)))
+    assert tracker.reconcile("a", start, [90.0]) == 1
+    assert actuals(postgres_client)[("a", BASE_TIME)] == 90.0
+
+def test_reconcile_only_touches_observed_locations_and_hours(postgres_client):
+    store(postgres_client, "a", 4)
+    store(postgres_client, "b", 4)
+    tracker = AccuracyTracker(postgres_client)
+
+    assert tracker.reconcile("a", BASE_TIME + timedelta(hours=1), [90.0, 80.0]) == 2
+    values = actuals(postgres_client)
+    assert values[("a", BASE_TIME)] is None
+    assert values[("a", BASE_TIME + timedelta(hours=2))] == 80.0
+    assert all(values[("b", BASE_TIME + timedelta(hours=h))] is None for h in range(4))
+
+def test_window_pass_matches_predictions_stored_after_actuals(postgres_client):
+    tracker = AccuracyTracker(postgres_client)
+    tracker.reconcile("a", BASE_TIME, [90.0])
+    store(postgres_client, "a", 1)
+
+    assert postgres_client.reconcile_actuals([], since=BASE_TIME - timedelta(hours=1)) == 1
+    assert postgres_client.reconcile_actuals([]) == 0
+
+def test_record_accuracy_does_not_persist_mock_defaults(postgres_client):
+    assert postgres_client.record_accuracy(5.0)
+
+    metrics = postgres_client.session.query(Metrics).one()
+    assert metrics.model_accuracy == 95.0
+    assert metrics.current_prediction == 0
+    assert metrics.data_points == 0
+    assert metrics.predictions_today == 0
+
+def test_backtest_publishes_accuracy_from_observations(postgres_client):
+    tracker = AccuracyTracker(postgres_client, fallback_model=StatisticalPredictor("seasonal-naive"))
+    tracker.backtest_hours = 24 * 16
+
+    end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    hours = np.arange(tracker.backtest_hours)
+    profile = 300 + 100 * np.sin(2 * np.pi * hours / 24)
+    tracker.reconcile("a", end - timedelta(hours=tracker.backtest_hours), profile.tolist())
+    # A location with gaps is left out of the backtest
+    tracker.reconcile("b", end - timedelta(hours=10), [1.0] * 5)
+
+    summary = tracker.backtest()
+    assert summary["series"] == 1 and summary["cutoffs"] == 2
+    assert summary["mape"] == pytest.approx(0, abs=1e-6)
+    assert postgres_client.session.query(Metrics).one().model_accuracy == 100.0
+
+def test_corrected_actuals_replace_earlier_ones(postgres_client):
+    store(postgres_client, "a", 2)
+    tracker = AccuracyTracker(postgres_client)
+    tracker.reconcile("a", BASE_TIME, [90.0, 80.0])
+
+    assert tracker.reconcile("a", BASE_TIME + timedelta(hours=1), [85.0]) == 1
+    values = actuals(postgres_client)
+    assert values[("a", BASE_TIME)] == 90.0
+    assert values[("a", BASE_TIME + timedelta(hours=1))] == 85.0
+
+    # The window pass applies the latest observation to late predictions
+    store(postgres_client, "a", 2)
+    assert postgres_client.reconcile_actuals([], since=BASE_TIME) == 2
+    late = postgres_client.session.query(Prediction).order_by(Prediction.id.desc()).limit(2).all()
+    assert sorted(p.actual_value for p in late) == [85.0, 90.0]
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import archiver
+from services.archiver import PredictionArchive, RetentionJob, POSTGRES_SCHEMA
+
+BASE_TIME = datetime(2026, 1, 1)
+
+def rows(first_id: int, n: int, start: datetime, location: str = "a"):
+    return [
+        {
+            "id": first_id + i,
+            "created_at": start + timedelta(hours=i),
+            "timestamp": start + timedelta(hours=i + 1),
+            "location": location,
+            "predicted_value": float(i),
+            "actual_value": None,
+            "confidence": 0.9,
+            "model_version": "test",
+        }
+        for i in range(n)
+    ]
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = PredictionArchive(str(tmp_path))
+    # Three days of hourly rows, one part per day
+    for day in range(3):
+        archive.write("postgres", rows(day * 24 + 1, 24, BASE_TIME + timedelta(days=day)), POSTGRES_SCHEMA)
+    return archive
+
+def test_pages_follow_the_cursor_across_parts(archive):
+    seen, after = [], None
+    while True:
+        page = archive.get_page(after=after, limit=10)
+        if not page:
+            break
+        seen += [row["id"] for row in page]
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    assert seen == list(range(1, 73))
+
+def test_page_stops_reading_once_full(archive, monkeypatch):
+    opened = []
+    parquet_file = archiver.pq.ParquetFile
+
+    def spy(path, **kwargs):
+        opened.append(path)
+        return parquet_file(path, **kwargs)
+
+    monkeypatch.setattr(archiver.pq, "ParquetFile", spy)
+    assert [row["id"] for row in archive.get_page(limit=5)] == [1, 2, 3, 4, 5]
+    assert len(opened) == 1
+
+def test_aware_start_is_compared_in_utc(archive):
+    start = datetime(2026, 1, 3, 2, tzinfo=timezone(timedelta(hours=2)))
+    page = archive.get_page(start=start, limit=1)
+
+    assert page[0]["created_at"] == datetime(2026, 1, 3)
+
+def test_series_is_capped(archive):
+    series = archive.get_series(max_points=30)
+
+    assert len(series["timestamp"]) == 30
+    assert series["truncated"]
+    assert not archive.get_series(max_points=100)["truncated"]
+
+@pytest.fixture
+def postgres_client(tmp_path, monkeypatch):
+    from database.postgres_client import PostgreSQLClient
+
+    monkeypatch.setenv("POSTGRESQL_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    client = PostgreSQLClient()
+    yield client
+    client.close()
+
+def store(postgres_client, n: int):
+    postgres_client.store_predictions([
+        {"time": (BASE_TIME + timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S"), "predicted_value": 1.0}
+        for h in range(n)
+    ])
+
+def test_rerun_after_failed_delete_does_not_duplicate(tmp_path, postgres_client, monkeypatch):
+    archive = PredictionArchive(str(tmp_path / "archive"))
+    job = RetentionJob(archive, postgres_client)
+    job.retention_days = 0
+    store(postgres_client, 5)
+
+    monkeypatch.setattr(postgres_client, "delete_predictions", lambda ids: 0)
+    assert job.run_once()["postgres"] == 0
+    monkeypatch.undo()
+    store(postgres_client, 3)
+    assert job.run_once()["postgres"] == 8
+
+    ids = [row["id"] for row in archive.get_page(limit=100)]
+    assert ids == list(range(1, 9))
+    assert postgres_client.get_prediction_page() == []
+
+def test_observations_are_archived(tmp_path, postgres_client):
+    archive = PredictionArchive(str(tmp_path / "archive"))
+    job = RetentionJob(archive, postgres_client)
+    job.retention_days = 0
+    postgres_client.reconcile_actuals([
+        {"location": "a", "timestamp": BASE_TIME + timedelta(hours=h), "actual_value": 2.0}
+        for h in range(3)
+    ])
+
+    assert job.run_once()["observations"] == 3
+    assert postgres_client.get_observations_before(datetime.utcnow()) == []
+    parts = list((tmp_path / "archive" / "observations").glob("date=*/part-*.parquet"))
+    assert len(parts) == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from datetime import datetime
+
+from services.downsampling import lttb_indices, minmax_indices
+from services.pagination import encode_cursor, decode_cursor
+
+def noisy_series(n: int = 1000):
+    rng = np.random.default_rng(0)
+    x = np.arange(n, dtype=np.int64) * 3600
+    y = 300 + 100 * np.sin(2 * np.pi * np.arange(n) / 24) + rng.normal(0, 20, n)
+    return x, y
+
+@pytest.mark.parametrize("n_out", [3, 10, 97, 500])
+def test_lttb_keeps_endpoints_and_returns_n_out(n_out):
+    x, y = noisy_series()
+    indices = lttb_indices(x, y, n_out)
+
+    assert len(indices) == n_out
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+def test_lttb_returns_everything_when_short():
+    x, y = noisy_series(5)
+    np.testing.assert_array_equal(lttb_indices(x, y, 10), np.arange(5))
+
+def test_minmax_keeps_extrema():
+    x, y = noisy_series()
+    indices = minmax_indices(x, y, 40)
+
+    assert len(indices) <= 40
+    assert np.argmax(y) in indices and np.argmin(y) in indices
+    # Every bucket's own min and max survive
+    buckets = np.array_split(np.arange(len(x)), 20)
+    kept = set(indices.tolist())
+    for bucket in buckets:
+        assert bucket[np.argmax(y[bucket])] in kept
+        assert bucket[np.argmin(y[bucket])] in kept
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678901)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(datetime(2026, 1, 1), 1)[:-4]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from models.statistical_model import StatisticalPredictor
+from services.forecast_scheduler import ForecastStore, ForecastScheduler
+
+BASE_TIME = datetime(2026, 1, 1)
+
+def make_scheduler(**kwargs) -> ForecastScheduler:
+    lstm_model = SimpleNamespace(trained=False)
+    return ForecastScheduler(ForecastStore(), lstm_model, StatisticalPredictor(), **kwargs)
+
+def test_register_caps_requested_locations():
+    scheduler = make_scheduler(locations=["default"])
+    scheduler.max_locations = 2
+
+    assert scheduler.register("a") and scheduler.register("b")
+    assert not scheduler.register("c")
+    # Configured and already tracked locations are always accepted
+    assert scheduler.register("default") and scheduler.register("a")
+    assert scheduler.locations == ["a", "b", "default"]
+
+def test_unrequested_locations_expire():
+    scheduler = make_scheduler(locations=["default"])
+    scheduler.register("a")
+    scheduler.location_ttl_seconds = -1
+
+    assert scheduler.expire() == ["a"]
+    assert scheduler.locations == ["default"]
+
+def test_refresh_publishes_registered_locations():
+    scheduler = make_scheduler(locations=["default"])
+    scheduler.register("a")
+    scheduler.refresh(BASE_TIME)
+
+    hit = scheduler.store.lookup("a", 24, now=BASE_TIME + timedelta(minutes=30))
+    assert hit["columns"]["predicted_value"].shape == (1, 24)
+    assert scheduler.store.lookup("unknown", 24, now=BASE_TIME) is None
+
+def test_unobserved_locations_leave_no_fallback_state():
+    scheduler = make_scheduler(locations=["default"])
+    scheduler.register("a")
+    scheduler.refresh(BASE_TIME)
+
+    assert scheduler.fallback_model.history == {}
+
+class RecordingStore:
+    def __init__(self):
+        self.calls = []
+
+    def store_predictions(self, records, model_version):
+        self.calls.append(records)
+        return True
+
+def test_refresh_persists_each_hour_once_in_one_insert():
+    postgres_client = RecordingStore()
+    scheduler = make_scheduler(locations=["a", "b"], postgres_client=postgres_client)
+    scheduler.horizon_hours = 24
+
+    scheduler.refresh(BASE_TIME)
+    scheduler.refresh(BASE_TIME + timedelta(hours=1))
+
+    first, second = postgres_client.calls
+    assert len(first) == 2 * 24
+    # Only the hour newly entering the horizon is written the second time
+    assert sorted((r["location"], r["time"]) for r in second) == [
+        ("a", "2026-01-02 00:00:00"), ("b", "2026-01-02 00:00:00")
+    ]
+
+def test_new_location_persists_full_horizon():
+    postgres_client = RecordingStore()
+    scheduler = make_scheduler(locations=["a"], postgres_client=postgres_client)
+    scheduler.horizon_hours = 24
+    scheduler.refresh(BASE_TIME)
+    scheduler.register("b")
+    scheduler.refresh(BASE_TIME + timedelta(hours=1))
+
+    locations = [r["location"] for r in postgres_client.calls[1]]
+    assert locations.count("a") == 1 and locations.count("b") == 24
+
+def test_horizon_covers_longest_request(monkeypatch):
+    monkeypatch.delenv("FORECAST_HORIZON_HOURS", raising=False)
+    monkeypatch.setenv("MAX_PREDICTION_HOURS", "720")
+    scheduler = make_scheduler()
+    scheduler.refresh(BASE_TIME)
+
+    late = BASE_TIME + timedelta(hours=5, minutes=30)
+    assert scheduler.store.lookup("default", 720, now=late) is not None
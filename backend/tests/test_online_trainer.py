@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from models.statistical_model import StatisticalPredictor
+from services.online_trainer import OnlineTrainer
+
+BASE_TIME = datetime(2026, 1, 1)
+
+class FakeLSTM:
+    sequence_length = 3
+    trained = True
+    fine_tune_count = 0
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    def fine_tune(self, series, epochs=3):
+        if self.fail:
+            raise RuntimeError("out of memory")
+        self.calls.append([s.tolist() for s in series])
+        self.fine_tune_count += 1
+        return object()
+
+def make_trainer(lstm_model) -> OnlineTrainer:
+    trainer = OnlineTrainer(lstm_model)
+    trainer.min_new_hours = 1
+    return trainer
+
+def test_gapped_uploads_train_as_separate_runs():
+    lstm_model = FakeLSTM()
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1, 2], BASE_TIME)
+    trainer.submit("a", [5, 6], BASE_TIME + timedelta(hours=4))
+
+    assert trainer.run_once()
+    assert lstm_model.calls == [[[1, 2], [5, 6]]]
+
+def test_next_upload_is_prefixed_with_context_only_when_contiguous():
+    lstm_model = FakeLSTM()
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1, 2, 3, 4], BASE_TIME)
+    trainer.run_once()
+
+    trainer.submit("a", [5, 6], BASE_TIME + timedelta(hours=4))
+    trainer.run_once()
+    trainer.submit("a", [9], BASE_TIME + timedelta(hours=9))
+    trainer.run_once()
+
+    assert lstm_model.calls[1] == [[2, 3, 4, 5, 6]]
+    assert lstm_model.calls[2] == [[9]]
+
+def test_repeated_hours_replace_pending_values():
+    lstm_model = FakeLSTM()
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1, 2, 3], BASE_TIME)
+    trainer.submit("a", [7], BASE_TIME + timedelta(hours=1))
+
+    assert trainer.pending_hours == 3
+    trainer.run_once()
+    assert lstm_model.calls == [[[1, 7, 3]]]
+
+def test_aware_start_is_converted_to_utc():
+    lstm_model = FakeLSTM()
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1], datetime(2026, 1, 1, 7, tzinfo=timezone(timedelta(hours=2))))
+
+    assert list(trainer._pending["a"]) == [datetime(2026, 1, 1, 5)]
+
+def test_failed_fine_tune_requeues_actuals():
+    lstm_model = FakeLSTM(fail=True)
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1, 2, 3], BASE_TIME)
+
+    with pytest.raises(RuntimeError):
+        trainer.run_once()
+    assert trainer.pending_hours == 3
+
+    lstm_model.fail = False
+    assert trainer.run_once()
+    assert lstm_model.calls == [[[1, 2, 3]]]
+
+def test_pending_hours_are_capped_per_location():
+    lstm_model = FakeLSTM()
+    trainer = make_trainer(lstm_model)
+    trainer.max_pending_hours = 3
+    trainer.submit("a", [1, 2], BASE_TIME)
+    trainer.submit("a", [3, 4, 5], BASE_TIME + timedelta(hours=2))
+
+    assert trainer.pending_hours == 3
+    trainer.run_once()
+    assert lstm_model.calls == [[[3, 4, 5]]]
+
+def test_new_locations_are_rejected_beyond_cap():
+    fallback_model = StatisticalPredictor()
+    trainer = OnlineTrainer(FakeLSTM(), fallback_model)
+    trainer.max_locations = 1
+
+    assert trainer.submit("a", [1.0], BASE_TIME)
+    assert not trainer.submit("b", [1.0], BASE_TIME)
+    assert trainer.submit("a", [2.0], BASE_TIME + timedelta(hours=1))
+    assert list(trainer._pending) == ["a"]
+    assert list(fallback_model.history) == ["a"]
+
+def test_untrained_model_discards_pending_actuals():
+    lstm_model = FakeLSTM()
+    lstm_model.trained = False
+    trainer = make_trainer(lstm_model)
+    trainer.submit("a", [1, 2, 3], BASE_TIME)
+
+    assert not trainer.run_once()
+    assert trainer.pending_hours == 0
@@ -0,0 +1,37 @@
+import threading
+import pytest
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from database.postgres_client import PostgreSQLClient
+
+BASE_TIME = datetime(2026, 1, 1)
+
+@pytest.fixture
+def postgres_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSTGRESQL_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    client = PostgreSQLClient()
+    yield client
+    client.close()
+
+def test_threads_return_connections_to_the_pool(postgres_client):
+    postgres_client.store_predictions([
+        {"time": (BASE_TIME + timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S"),
+         "predicted_value": 100.0, "location": "a"}
+        for h in range(10)
+    ])
+    threads = 20
+    # Keep every worker thread alive until all have read, as request threads are
+    done = threading.Barrier(threads, timeout=60)
+
+    def read(_):
+        rows = postgres_client.get_prediction_page(limit=5)
+        postgres_client.get_observation_matrix(BASE_TIME, BASE_TIME + timedelta(hours=10))
+        postgres_client.get_prediction_accuracy(BASE_TIME)
+        postgres_client.get_metrics()
+        done.wait()
+        return len(rows)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        assert list(pool.map(read, range(threads))) == [5] * threads
+        assert postgres_client.pool_checked_out() == 0
@@ -0,0 +1,94 @@
+import json
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+from models.forecast_columns import FIELDS
+from services import response_encoding
+from services.response_encoding import (
+    MEDIA_TYPES, UnsupportedEncoding, encode_forecast, iter_ndjson, negotiate_encoding
+)
+
+BASE_TIME = datetime(2026, 1, 1)
+
+def make_forecast(n_locations: int = 2, hours: int = 5) -> dict:
+    base = np.arange(n_locations * hours, dtype=np.float32).reshape(n_locations, hours)
+    return {
+        "locations": [f"loc-{i}" for i in range(n_locations)],
+        "base_time": BASE_TIME,
+        "columns": {field: base + offset for offset, field in enumerate(FIELDS)},
+        "model_version": "holt-winters-v1.0",
+        "tier": "holt-winters",
+        "confidence": 0.9
+    }
+
+def test_columnar_round_trip():
+    forecast = make_forecast()
+    body, media_type = encode_forecast(forecast, "columnar")
+    payload = json.loads(body)
+
+    assert media_type == MEDIA_TYPES["columnar"]
+    assert payload["locations"] == forecast["locations"]
+    assert payload["start"] == BASE_TIME.isoformat()
+    assert payload["hours"] == 5 and payload["step_seconds"] == 3600
+    for field in FIELDS:
+        np.testing.assert_allclose(payload[field], forecast["columns"][field])
+
+def test_msgpack_round_trip_keeps_dtype_and_shape():
+    msgpack = pytest.importorskip("msgpack")
+    forecast = make_forecast(n_locations=3, hours=4)
+    body, _ = encode_forecast(forecast, "msgpack")
+    payload = msgpack.unpackb(body, raw=False)
+
+    shape = (len(payload["locations"]), payload["hours"])
+    assert shape == (3, 4)
+    for field in FIELDS:
+        values = np.frombuffer(payload[field], dtype=payload["dtype"]).reshape(shape)
+        assert values.dtype == np.dtype("<f4")
+        np.testing.assert_array_equal(values, forecast["columns"][field])
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    forecast = make_forecast(n_locations=2, hours=3)
+    body, _ = encode_forecast(forecast, "arrow")
+    table = pa.ipc.open_stream(body).read_all()
+
+    assert pa.types.is_dictionary(table.schema.field("location").type)
+    assert table.schema.metadata[b"tier"] == b"holt-winters"
+    assert table.column("location").to_pylist() == ["loc-0"] * 3 + ["loc-1"] * 3
+    expected_times = [BASE_TIME + timedelta(hours=h) for h in range(3)] * 2
+    assert table.column("time").to_pylist() == expected_times
+    for field in FIELDS:
+        np.testing.assert_array_equal(table.column(field).to_numpy(),
+                                      forecast["columns"][field].ravel())
+
+def test_negotiate_prefers_explicit_format():
+    assert negotiate_encoding("application/x-msgpack", "columnar") == "columnar"
+    with pytest.raises(UnsupportedEncoding):
+        negotiate_encoding(None, "xml")
+
+def test_negotiate_uses_first_known_accept_type():
+    accept = "text/html, application/vnd.apache.arrow.stream;q=0.9, application/x-msgpack"
+    assert negotiate_encoding(accept) == "arrow"
+    assert negotiate_encoding("text/html") == "json"
+    assert negotiate_encoding(None) == "json"
+
+def test_negotiate_skips_missing_libraries(monkeypatch):
+    monkeypatch.setattr(response_encoding, "msgpack", None)
+    assert negotiate_encoding("application/x-msgpack") == "json"
+    with pytest.raises(UnsupportedEncoding):
+        negotiate_encoding(None, "msgpack")
+
+@pytest.mark.parametrize("chunk_hours", [1, 4, 5, 7])
+def test_ndjson_chunks_cover_every_hour_once(chunk_hours):
+    forecast = make_forecast(n_locations=2, hours=10)
+    lines = [json.loads(line) for line in iter_ndjson(forecast, chunk_hours)]
+
+    assert len(lines) == 2 * -(-10 // chunk_hours)
+    for row, location in enumerate(forecast["locations"]):
+        chunks = [line for line in lines if line["location"] == location]
+        starts = [datetime.fromisoformat(chunk["start"]) for chunk in chunks]
+        assert starts == [BASE_TIME + timedelta(hours=h) for h in range(0, 10, chunk_hours)]
+        for field in FIELDS:
+            values = np.concatenate([chunk[field] for chunk in chunks])
+            np.testing.assert_allclose(values, forecast["columns"][field][row])
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+
+from models.statistical_model import (
+    SeasonalNaiveForecaster, HoltWintersForecaster, StatisticalPredictor
+)
+
+BASE_TIME = datetime(2026, 1, 1)
+
+def hours_before(n_hours: int) -> datetime:
+    return BASE_TIME - timedelta(hours=n_hours)
+
+def daily_profile(n_hours: int, level: float = 300.0) -> np.ndarray:
+    hours = np.arange(n_hours)
+    return level + 100 * np.sin(2 * np.pi * hours / 24)
+
+@pytest.mark.parametrize("forecaster", [SeasonalNaiveForecaster(), HoltWintersForecaster()])
+@pytest.mark.parametrize("n_hours", [1, 5, 23, 24, 30, 47])
+def test_short_history_forecasts_full_horizon(forecaster, n_hours):
+    history = daily_profile(n_hours)[None, :]
+    point, sigma = forecaster.forecast(history, 48)
+
+    assert point.shape == sigma.shape == (1, 48)
+    assert np.isfinite(point).all() and np.isfinite(sigma).all()
+
+def test_seasonal_naive_tiles_partial_season():
+    history = np.array([[1.0, 2.0, 3.0]])
+    point, _ = SeasonalNaiveForecaster(24).forecast(history, 7)
+
+    np.testing.assert_array_equal(point, [[1, 2, 3, 1, 2, 3, 1]])
+
+def test_seasonal_naive_repeats_last_season():
+    history = daily_profile(24 * 3)[None, :]
+    point, _ = SeasonalNaiveForecaster(24).forecast(history, 48)
+
+    np.testing.assert_allclose(point[0], np.tile(history[0, -24:], 2))
+
+def test_holt_winters_tracks_seasonal_profile():
+    history = daily_profile(24 * 14)[None, :]
+    point, _ = HoltWintersForecaster().forecast(history, 24)
+
+    np.testing.assert_allclose(point[0], daily_profile(24), atol=15)
+
+def test_predictor_single_hour_location():
+    predictor = StatisticalPredictor()
+    predictor.observe("zz", [300.0], hours_before(1))
+
+    point, sigma = predictor.forecast_array(["zz"], 24, BASE_TIME)
+    assert point.shape == (1, 24)
+    np.testing.assert_allclose(point, 300.0)
+
+def test_predictor_short_history_does_not_truncate_batch():
+    predictor = StatisticalPredictor()
+    long_history = daily_profile(24 * 14)
+    predictor.observe("long", long_history, hours_before(len(long_history)))
+    predictor.observe("short", daily_profile(30), hours_before(30))
+
+    together, _ = predictor.forecast_array(["long", "short"], 24, BASE_TIME)
+    alone, _ = predictor.forecast_array(["long"], 24, BASE_TIME)
+
+    # The long series still gets Holt-Winters over its full history
+    np.testing.assert_allclose(together[0], alone[0])
+    expected, _ = HoltWintersForecaster().forecast(long_history[None, :], 24)
+    np.testing.assert_allclose(together[0], np.maximum(0, expected[0]))
+
+def test_predictor_ignores_empty_observations():
+    predictor = StatisticalPredictor()
+    predictor.observe("empty", [])
+
+    assert "empty" not in predictor.history
+
+def test_observe_fills_gaps_from_previous_season():
+    predictor = StatisticalPredictor(method="seasonal-naive")
+    profile = daily_profile(24 * 3)
+    predictor.observe("a", profile[:24], hours_before(72))
+    predictor.observe("a", profile[48:], hours_before(24))
+
+    np.testing.assert_allclose(predictor.history["a"], np.tile(profile[:24], 3))
+    assert predictor.history_end["a"] == BASE_TIME
+
+def test_observe_overwrites_repeated_hours():
+    predictor = StatisticalPredictor()
+    predictor.observe("a", np.ones(48), hours_before(48))
+    predictor.observe("a", [5.0, 5.0], hours_before(10))
+
+    assert len(predictor.history["a"]) == 48
+    assert predictor.history["a"][-10:-8].tolist() == [5.0, 5.0]
+    assert predictor.history_end["a"] == BASE_TIME
+
+def test_forecast_keeps_phase_when_actuals_lag():
+    predictor = StatisticalPredictor(method="seasonal-naive")
+    profile = daily_profile(24 * 3)
+    # History stops five hours before the forecast starts
+    predictor.observe("a", profile[:-5], hours_before(72))
+
+    point, _ = predictor.forecast_array(["a"], 24, BASE_TIME)
+    np.testing.assert_allclose(point[0], daily_profile(24), atol=1e-9)
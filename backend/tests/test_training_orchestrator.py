@@ -0,0 +1,36 @@
+import os
+import numpy as np
+
+from models.training_orchestrator import TrainingOrchestrator, _artifact_prefix
+
+def fake_train(location: str, history: np.ndarray, epochs: int, checkpoint_dir: str) -> dict:
+    """Stands in for LSTM training; fails for locations named 'fail'"""
+    prefix = _artifact_prefix(checkpoint_dir, location)
+    with open(f"{prefix}.calls", "a") as f:
+        f.write("1")
+    if location == "fail" and not os.path.exists(os.path.join(checkpoint_dir, "fixed")):
+        raise RuntimeError("diverged")
+    return {"loss": float(np.mean(history)), "model_path": f"{prefix}.keras"}
+
+def calls(checkpoint_dir, location: str) -> int:
+    with open(f"{_artifact_prefix(str(checkpoint_dir), location)}.calls") as f:
+        return len(f.read())
+
+def test_artifact_prefixes_do_not_collide(tmp_path):
+    assert _artifact_prefix(str(tmp_path), "a/b") != _artifact_prefix(str(tmp_path), "a_b")
+
+def test_train_resumes_from_manifest(tmp_path):
+    histories = {name: np.full(4, float(i)) for i, name in enumerate(["a/b", "a_b", "fail"])}
+    orchestrator = TrainingOrchestrator(str(tmp_path), workers=1, threads_per_worker=1,
+                                        train_fn=fake_train)
+
+    manifest = orchestrator.train(histories)
+    assert sorted(manifest) == ["a/b", "a_b"]
+    assert manifest["a_b"]["loss"] == 1.0
+
+    # A rerun trains only the location that failed
+    open(tmp_path / "fixed", "w").close()
+    manifest = TrainingOrchestrator(str(tmp_path), workers=1, threads_per_worker=1,
+                                    train_fn=fake_train).train(histories)
+    assert sorted(manifest) == ["a/b", "a_b", "fail"]
+    assert [calls(tmp_path, name) for name in ["a/b", "a_b", "fail"]] == [1, 1, 2]